@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL.
+
+    With coalesce, concurrent misses for one key share a single load. With
+    stale_ttl > 0, an entry up to stale_ttl seconds past its TTL is still
+    returned by get_or_load while one background task reloads it. A ttl of
+    0 or less turns the cache off: nothing is stored and every get_or_load
+    calls its loader, stale_ttl notwithstanding.
+    """
+
+    def __init__(self, name: str, ttl: float = 300.0, maxsize: int = 256, coalesce: bool = True, stale_ttl: float = 0.0):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.coalesce = coalesce
+        self.stale_ttl = stale_ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.refresh_failures = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Task] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry; called after any write to the backing collection"""
+        self._entries.clear()
+        # Loads already running may predate the write; later misses start their own
+        self._loading.clear()
+        self.version += 1
+        self.invalidations += 1
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], version: int) -> Any:
+        try:
+            value = await loader()
+        finally:
+            if self._loading.get(key) is asyncio.current_task():
+                del self._loading[key]
+        # A write landed while we were loading; don't cache what may be stale
+        if value is not None and version == self.version:
+            self.set(key, value)
+        return value
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        # Version taken now, not when the task first runs, so a load created
+        # before an invalidate() is never cached even if it starts after it
+        task = asyncio.create_task(self._load(key, loader, self.version))
+        self._loading[key] = task
+        return task
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_failures += 1
+            logger.warning(f"Background refresh of {self.name} cache failed: {task.exception()}")
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling loader on a miss"""
+        if self.ttl <= 0:
+            self.misses += 1
+            return await loader()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if now < expires_at + self.stale_ttl:
+                # Serve the expired copy now; one request's worth of work refreshes it
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._loading:
+                    self._start_load(key, loader).add_done_callback(self._refresh_done)
+                return value
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+
+        if not self.coalesce:
+            return await self._load(key, loader, self.version)
+
+        task = self._loading.get(key)
+        if task is None:
+            task = self._start_load(key, loader)
+        else:
+            self.coalesced += 1
+        # One waiter going away (client disconnect) must not cancel the shared load
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        served = self.hits + self.stale_hits
+        lookups = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "coalesced": self.coalesced,
+            "stale_ttl_seconds": self.stale_ttl,
+            "stale_hits": self.stale_hits,
+            "refresh_failures": self.refresh_failures,
+        }
+
+
+_caches: Dict[str, TTLCache] = {}
+
+
+def get_cache(name: str, coalesce: bool = True, stale_ttl: float = 0.0, maxsize: Optional[int] = None) -> TTLCache:
+    """Get (or create) the cache for a collection; options apply on creation"""
+    if name not in _caches:
+        _caches[name] = TTLCache(
+            name,
+            ttl=float(os.environ.get("CACHE_TTL_SECONDS", "300")),
+            maxsize=maxsize if maxsize is not None else int(os.environ.get("CACHE_MAX_ENTRIES", "256")),
+            coalesce=coalesce,
+            stale_ttl=stale_ttl,
+        )
+    return _caches[name]
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from pymongo import DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+
+from crud import CrudRepository
+from database import get_database
+
+
+logger = logging.getLogger(__name__)
+
+# $changeStream on a standalone server
+CHANGE_STREAMS_UNSUPPORTED = 40573
+# Resume point has aged out of the oplog, or the token can't be used
+RESUME_TOKEN_UNUSABLE = (260, 280, 286)
+
+
+class CacheSync:
+    """Invalidates repository caches when another worker writes to their collections.
+
+    Watches one database-level change stream filtered to the repositories'
+    collections. Without change streams (standalone MongoDB) it polls each
+    collection's newest updated_at and document count instead.
+    """
+
+    def __init__(self, repositories: List[CrudRepository], mode: str = "auto", poll_interval: float = 5.0):
+        self.repositories: Dict[str, CrudRepository] = {repo.collection.name: repo for repo in repositories}
+        self.mode = mode
+        self.poll_interval = poll_interval
+        # Kept across reconnects so no change is missed while the stream is down
+        self.resume_token: Optional[dict] = None
+        self.active_mode: Optional[str] = None
+        self.changes_seen = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.mode == "off" or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _invalidate(self, name: Optional[str] = None) -> None:
+        targets = [self.repositories[name]] if name else self.repositories.values()
+        for repository in targets:
+            repository.mark_written()
+
+    async def _run(self) -> None:
+        if self.mode in ("auto", "change_stream"):
+            try:
+                await self._watch()
+                return
+            except (NotImplementedError, OperationFailure) as e:
+                code = getattr(e, "code", None)
+                if self.mode == "change_stream" or not (
+                    isinstance(e, NotImplementedError) or code == CHANGE_STREAMS_UNSUPPORTED
+                ):
+                    logger.error(f"Cache sync stopped: {e}")
+                    return
+                logger.info(f"Change streams unavailable ({e}); polling every {self.poll_interval}s instead")
+            except Exception as e:
+                logger.error(f"Cache sync stopped: {e}")
+                return
+        await self._poll()
+
+    async def _watch(self) -> None:
+        pipeline = [{"$match": {"$or": [
+            {"ns.coll": {"$in": list(self.repositories)}},
+            {"operationType": {"$in": ["dropDatabase", "invalidate"]}},
+        ]}}]
+        backoff = 1.0
+        while True:
+            try:
+                async with get_database().watch(pipeline, resume_after=self.resume_token) as stream:
+                    if self.active_mode != "change_stream":
+                        self.active_mode = "change_stream"
+                        logger.info("Cache sync watching change streams")
+                    backoff = 1.0
+                    while True:
+                        change = await stream.try_next()
+                        # Advances even when no events arrive, so resuming stays cheap
+                        self.resume_token = stream.resume_token
+                        if change is None:
+                            continue
+                        self.changes_seen += 1
+                        if change["operationType"] in ("dropDatabase", "invalidate"):
+                            self.resume_token = None
+                            self._invalidate()
+                            break
+                        self._invalidate(change["ns"]["coll"])
+            except OperationFailure as e:
+                if self.active_mode is None:
+                    # Never connected: let _run decide whether to fall back
+                    raise
+                if e.code in RESUME_TOKEN_UNUSABLE:
+                    # Changes may have been missed; start fresh from an empty cache
+                    logger.warning(f"Change stream resume token unusable ({e}); invalidating all caches")
+                    self.resume_token = None
+                    self._invalidate()
+                else:
+                    await self._reconnect_after(e, backoff)
+                    backoff = min(backoff * 2, 30.0)
+            except PyMongoError as e:
+                await self._reconnect_after(e, backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    async def _reconnect_after(self, error: Exception, delay: float) -> None:
+        self.reconnects += 1
+        logger.warning(f"Change stream interrupted ({error}); reconnecting in {delay:.0f}s")
+        await asyncio.sleep(delay)
+
+    async def _signature(self, repository: CrudRepository) -> tuple:
+        collection = repository.collection
+        latest, count = await asyncio.gather(
+            collection.find({}, {"_id": 0, "updated_at": 1}).sort("updated_at", DESCENDING).limit(1).to_list(1),
+            collection.estimated_document_count(),
+        )
+        # updated_at catches inserts and updates, the count catches deletes
+        return (latest[0].get("updated_at") if latest else None, count)
+
+    async def _poll(self) -> None:
+        self.active_mode = "poll"
+        signatures: Dict[str, tuple] = {}
+        while True:
+            for name, repository in self.repositories.items():
+                try:
+                    signature = await self._signature(repository)
+                except PyMongoError as e:
+                    logger.warning(f"Cache sync poll of {name} failed: {e}")
+                    continue
+                if name in signatures and signatures[name] != signature:
+                    self.changes_seen += 1
+                    self._invalidate(name)
+                signatures[name] = signature
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.active_mode,
+            "collections": list(self.repositories),
+            "changes_seen": self.changes_seen,
+            "reconnects": self.reconnects,
+            "has_resume_token": self.resume_token is not None,
+        }
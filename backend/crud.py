@@ -0,0 +1,341 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, create_model
+from pymongo import ReturnDocument
+
+from cache import get_cache
+from models import ApiResponse
+from pagination import paginate
+from rendering import RenderedPayload, payload_response, render_model, render_models
+from tracing import span
+
+
+async def update_by_id(collection, item_id: str, fields: dict) -> Optional[dict]:
+    """Set fields (and updated_at) on the document with this id in one round trip.
+
+    Returns the updated document, or None if no document has that id.
+    """
+    return await collection.find_one_and_update(
+        {"id": item_id},
+        {"$set": {**fields, "updated_at": datetime.utcnow()}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return (id is always included); * for every field"
+
+
+def select_fields(
+    model: Type[BaseModel],
+    fields: Optional[str],
+    default_exclude: Tuple[str, ...] = (),
+) -> Optional[Tuple[str, ...]]:
+    """Parse a fields= parameter into the model fields to return (None means all)"""
+    if fields is None:
+        if not default_exclude:
+            return None
+        return tuple(name for name in model.model_fields if name not in default_exclude)
+
+    if fields.strip() == "*":
+        return None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # Model order, so the same set of fields always gives the same cache key and model
+    selected = {"id", *requested}
+    return tuple(name for name in model.model_fields if name in selected)
+
+
+def projection_for(fields: Optional[Tuple[str, ...]]) -> dict:
+    if fields is None:
+        return {"_id": 0}
+    return {"_id": 0, **{name: 1 for name in fields}}
+
+
+@lru_cache(maxsize=128)
+def trimmed_model(model: Type[BaseModel], fields: Optional[Tuple[str, ...]]) -> Type[BaseModel]:
+    """Model with only the selected fields, so sparse documents still validate"""
+    if fields is None:
+        return model
+    return create_model(
+        f"{model.__name__}Fields",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields},
+    )
+
+
+class CrudRepository:
+    """Cached, instrumented data access for one content collection.
+
+    Cached loads read from the primary, so a load right after a write's
+    invalidation can't cache what a lagging secondary still returns.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        collection,
+        model: Type[BaseModel],
+        create_schema: Type[BaseModel],
+        extra_fields: Optional[Callable[[BaseModel], dict]] = None,
+        list_query: Optional[dict] = None,
+        list_sort: Optional[list] = None,
+        list_exclude: Tuple[str, ...] = (),
+        coalesce: bool = True,
+        stale_ttl: float = 0.0,
+    ):
+        self.name = name
+        self.collection = collection
+        self.model = model
+        self.create_schema = create_schema
+        self.extra_fields = extra_fields
+        # Filter and order of the collection's main listing (GET /)
+        self.list_query = list_query or {}
+        self.list_sort = list_sort
+        # Fields left out of list responses unless asked for with fields=
+        self.list_exclude = list_exclude
+        # See TTLCache: share concurrent loads, and serve expired entries for
+        # up to stale_ttl seconds while they are refreshed in the background
+        self.cache = get_cache(name, coalesce=coalesce, stale_ttl=stale_ttl)
+        # By-id and batch payloads: one entry per id (or id set), so kept apart
+        # from the listings they would otherwise evict
+        self.item_cache = get_cache(
+            f"{name}_items", coalesce=coalesce, maxsize=int(os.environ.get("ITEM_CACHE_MAX_ENTRIES", "1024"))
+        )
+        # Last-Modified floor for listings; writes before this worker started
+        # are covered by its start time
+        self.last_written = datetime.utcnow()
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.write_hooks: List[Callable[[], Any]] = [self.cache.invalidate, self.item_cache.invalidate]
+        _repositories[name] = self
+
+    @asynccontextmanager
+    async def timed(self, operation: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            timing = self.timings.setdefault(operation, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            timing["count"] += 1
+            timing["total_ms"] += elapsed_ms
+            timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+
+    def on_write(self, hook: Callable[[], Any]) -> None:
+        """Run hook after every successful create/update/delete"""
+        self.write_hooks.append(hook)
+
+    def mark_written(self) -> None:
+        """Run the write hooks; also called when another worker wrote to the collection"""
+        self.last_written = datetime.utcnow()
+        for hook in self.write_hooks:
+            hook()
+
+    def _extra(self, data: BaseModel) -> dict:
+        return self.extra_fields(data) if self.extra_fields else {}
+
+    async def list(
+        self,
+        key: Hashable,
+        query: Optional[dict] = None,
+        sort: Optional[list] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> RenderedPayload:
+        async def load():
+            async with self.timed("list"):
+                cursor = self.collection.find(query or {}, projection_for(fields))
+                if sort:
+                    cursor = cursor.sort(sort)
+                with span("db"):
+                    documents = await cursor.to_list(length=None)
+            return render_models(trimmed_model(self.model, fields), documents, last_written)
+
+        last_written = self.last_written
+        return await self.cache.get_or_load((key, fields), load)
+
+    async def list_default(self, fields: Optional[Tuple[str, ...]] = None) -> RenderedPayload:
+        """The collection's main listing, as served by GET /"""
+        return await self.list("list", self.list_query, self.list_sort, fields)
+
+    async def page(
+        self,
+        key: Hashable,
+        query: dict,
+        field: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> RenderedPayload:
+        async def load(collection):
+            async with self.timed("page"):
+                return await paginate(
+                    collection, query, field, trimmed_model(self.model, fields),
+                    limit, cursor, projection_for(fields),
+                )
+
+        if cursor is not None:
+            # Only first pages are hot; caching every cursor would let one
+            # crawler evict the listings the cache is there for
+            return await load(self.collection.reader)
+        return await self.cache.get_or_load((key, limit, fields), lambda: load(self.collection))
+
+    async def get(self, item_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[RenderedPayload]:
+        async def load():
+            async with self.timed("get"), span("db"):
+                document = await self.collection.find_one({"id": item_id}, projection_for(fields))
+            return render_model(trimmed_model(self.model, fields), document) if document else None
+
+        return await self.item_cache.get_or_load(("id", item_id, fields), load)
+
+    async def get_many(self, item_ids: List[str], fields: Optional[Tuple[str, ...]] = None) -> RenderedPayload:
+        """Fetch several documents with one $in query, in the order requested"""
+        async def load():
+            async with self.timed("get_many"), span("db"):
+                cursor = self.collection.find({"id": {"$in": item_ids}}, projection_for(fields))
+                documents = {document["id"]: document async for document in cursor}
+            found = [documents[i] for i in item_ids if i in documents]
+            return render_models(trimmed_model(self.model, fields), found, last_written)
+
+        last_written = self.last_written
+        return await self.item_cache.get_or_load(("ids", tuple(item_ids), fields), load)
+
+    async def create(self, data: BaseModel) -> BaseModel:
+        item = self.model(**data.dict())
+        async with self.timed("create"), span("db"):
+            await self.collection.insert_one({**item.dict(), **self._extra(data)})
+        self.mark_written()
+        return item
+
+    async def update(self, item_id: str, data: BaseModel) -> Optional[BaseModel]:
+        async with self.timed("update"), span("db"):
+            document = await update_by_id(self.collection, item_id, {**data.dict(), **self._extra(data)})
+        if not document:
+            return None
+        self.mark_written()
+        return self.model(**document)
+
+    async def delete(self, item_id: str) -> bool:
+        async with self.timed("delete"), span("db"):
+            result = await self.collection.delete_one({"id": item_id})
+        if result.deleted_count == 0:
+            return False
+        self.mark_written()
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            operation: {**timing, "avg_ms": round(timing["total_ms"] / timing["count"], 3)}
+            for operation, timing in self.timings.items()
+        }
+
+
+_repositories: Dict[str, CrudRepository] = {}
+
+
+def repository_stats() -> Dict[str, Dict[str, Dict[str, float]]]:
+    return {name: repository.stats() for name, repository in _repositories.items()}
+
+
+def register_crud_routes(
+    router: APIRouter,
+    repository: CrudRepository,
+    *,
+    singular: str,
+    plural: str,
+    list_description: str = "",
+) -> None:
+    """Add list/batch/get/create/update/delete routes for repository to router.
+
+    Call this after the router's own routes so fixed paths like "/featured"
+    are matched before "/{item_id}". singular/plural are lower-case labels
+    used in summaries and error messages, e.g. "hero slide"/"hero slides".
+    """
+    model = repository.model
+    create_schema = repository.create_schema
+    not_found = f"{singular[0].upper()}{singular[1:]} not found"
+
+    async def list_items(request: Request, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+        selected = select_fields(model, fields, repository.list_exclude)
+        try:
+            return payload_response(request, await repository.list_default(selected))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching {plural}: {str(e)}")
+
+    async def get_items_batch(
+        request: Request,
+        ids: str = Query(..., description="Comma-separated ids (max 100)"),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    ):
+        item_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+        if not item_ids or len(item_ids) > 100:
+            raise HTTPException(status_code=400, detail="Provide between 1 and 100 ids")
+        selected = select_fields(model, fields)
+        try:
+            return payload_response(request, await repository.get_many(item_ids, selected))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching {plural}: {str(e)}")
+
+    async def get_item(
+        request: Request,
+        item_id: str,
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    ):
+        selected = select_fields(model, fields)
+        try:
+            payload = await repository.get(item_id, selected)
+            if not payload:
+                raise HTTPException(status_code=404, detail=not_found)
+            return payload_response(request, payload)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching {singular}: {str(e)}")
+
+    async def create_item(item: create_schema):
+        try:
+            return await repository.create(item)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error creating {singular}: {str(e)}")
+
+    async def update_item(item_id: str, item_update: create_schema):
+        try:
+            updated = await repository.update(item_id, item_update)
+            if not updated:
+                raise HTTPException(status_code=404, detail=not_found)
+            return updated
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error updating {singular}: {str(e)}")
+
+    async def delete_item(item_id: str):
+        try:
+            if not await repository.delete(item_id):
+                raise HTTPException(status_code=404, detail=not_found)
+            return ApiResponse(message=f"{singular[0].upper()}{singular[1:]} deleted successfully")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error deleting {singular}: {str(e)}")
+
+    name = repository.name
+    router.add_api_route("/", list_items, methods=["GET"], response_model=List[model],
+                         name=f"list_{name}", summary=f"Get {plural}", description=list_description)
+    router.add_api_route("/batch", get_items_batch, methods=["GET"], response_model=List[model],
+                         name=f"batch_{name}", summary=f"Get several {plural} by id")
+    router.add_api_route("/{item_id}", get_item, methods=["GET"], response_model=model,
+                         name=f"get_{name}", summary=f"Get a {singular} by id")
+    router.add_api_route("/", create_item, methods=["POST"], response_model=model,
+                         name=f"create_{name}", summary=f"Create a {singular}")
+    router.add_api_route("/{item_id}", update_item, methods=["PUT"], response_model=model,
+                         name=f"update_{name}", summary=f"Update a {singular}")
+    router.add_api_route("/{item_id}", delete_item, methods=["DELETE"], response_model=ApiResponse,
+                         name=f"delete_{name}", summary=f"Delete a {singular}")
@@ -1,266 +1,348 @@
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, DeleteMany, IndexModel, ReadPreference, UpdateOne
+from pymongo.monitoring import ConnectionPoolListener
 import os
+import threading
 from dotenv import load_dotenv
 from pathlib import Path
+from typing import List, Optional
+from metrics import command_metrics
+from models import normalize_category
+from tracing import SlowCommandLogger
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+
+class PoolMonitor(ConnectionPoolListener):
+    """Connection pool counters, aggregated over every server in the topology"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.created = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add(pool_clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add(open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._add(checked_out=-1)
+
+
+def client_options() -> dict:
+    """Motor client settings, overridable from .env"""
+    env = os.environ.get
+    options = {
+        "maxPoolSize": int(env("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(env("MONGO_MIN_POOL_SIZE", "0")),
+        "waitQueueTimeoutMS": int(env("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+        "serverSelectionTimeoutMS": int(env("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000")),
+        "connectTimeoutMS": int(env("MONGO_CONNECT_TIMEOUT_MS", "3000")),
+        # Stay under the frontend's 10s request timeout
+        "socketTimeoutMS": int(env("MONGO_SOCKET_TIMEOUT_MS", "8000")),
+    }
+    compressors = env("MONGO_COMPRESSORS", "")
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+pool_monitor = PoolMonitor()
+slow_command_logger = SlowCommandLogger(float(os.environ.get("SLOW_COMMAND_MS", "100")))
+_client: Optional[AsyncIOMotorClient] = None
+_db = None
+_read_db = None
+
+
+def connect_to_database(client: Optional[AsyncIOMotorClient] = None):
+    """Create the Motor client; called from the app's startup hook (or with a ready-made client)"""
+    global _client, _db, _read_db
+    if _client is not None:
+        return _db
+
+    if client is None:
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'], event_listeners=[pool_monitor, command_metrics, slow_command_logger], **client_options()
+        )
+    _client = client
+    _db = client[os.environ['DB_NAME']]
+    # Uncached GET routes (exports, subscriber pages, counts) read through this
+    # handle. Writes, and cache loads, always use the primary: caches are
+    # invalidated on write and would otherwise refill from a lagging secondary
+    read_preference = READ_PREFERENCES[os.environ.get("MONGO_READ_PREFERENCE", "primary")]
+    _read_db = client.get_database(os.environ['DB_NAME'], read_preference=read_preference)
+    return _db
+
+
+def get_database():
+    if _db is None:
+        raise RuntimeError("Database not connected; call connect_to_database() first")
+    return _db
+
+
+def pool_stats() -> dict:
+    options = client_options()
+    return {
+        "max_pool_size": options["maxPoolSize"],
+        "min_pool_size": options["minPoolSize"],
+        "open_connections": pool_monitor.open,
+        "checked_out": pool_monitor.checked_out,
+        "waiting": pool_monitor.waiting,
+        "connections_created": pool_monitor.created,
+        "checkout_failures": pool_monitor.checkout_failures,
+        "pool_clears": pool_monitor.pool_clears,
+        "read_preference": os.environ.get("MONGO_READ_PREFERENCE", "primary"),
+    }
+
+
+class LazyCollection:
+    """Stands in for a collection until the client exists, then forwards to it"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @property
+    def reader(self):
+        """The collection with the configured read preference, for uncached GET routes"""
+        if _read_db is None:
+            raise RuntimeError("Database not connected; call connect_to_database() first")
+        return _read_db[self.name]
+
+    def __getattr__(self, attribute):
+        return getattr(get_database()[self.name], attribute)
+
 
 # Collections
-hero_slides_collection = db.hero_slides
-cultural_categories_collection = db.cultural_categories
-regional_highlights_collection = db.regional_highlights
-featured_stories_collection = db.featured_stories
-newsletter_subscribers_collection = db.newsletter_subscribers
-
-
-async def init_database():
-    """Initialize database with sample data if collections are empty"""
-    
-    # Sample hero slides data
-    hero_slides_sample = [
-        {
-            "id": "1",
-            "title": "Classical Dance Forms",
-            "description": "Bharatanatyam, Kathak, Odissi - Ancient stories told through graceful movements",
-            "categories": ["Dance", "Arts", "Traditions"],
-            "bg_color": "#d987ff",
-            "text_color": "#151515",
-            "image_url": "https://images.unsplash.com/photo-1578662996442-48f60103fc96?w=800&h=600&fit=crop",
-            "region": "Pan-India",
-            "is_active": True,
-            "sort_order": 1
-        },
-        {
-            "id": "2",
-            "title": "Vibrant Festivals",
-            "description": "Diwali, Holi, Durga Puja - Celebrations that unite communities across the nation",
-            "categories": ["Festivals", "Traditions", "Community"],
-            "bg_color": "#ffe03d",
-            "text_color": "#151515",
-            "image_url": "https://images.unsplash.com/photo-1605379399642-870262d3d051?w=800&h=600&fit=crop",
-            "region": "National",
-            "is_active": True,
-            "sort_order": 2
-        },
-        {
-            "id": "3",
-            "title": "Magnificent Architecture",
-            "description": "From Taj Mahal to ancient temples - Architectural marvels that define India's skyline",
-            "categories": ["Architecture", "Heritage", "History"],
-            "bg_color": "#88a2ff",
-            "text_color": "#ffffff",
-            "image_url": "https://images.unsplash.com/photo-1564507592333-c60657eea523?w=800&h=600&fit=crop",
-            "region": "Historical",
-            "is_active": True,
-            "sort_order": 3
-        },
-        {
-            "id": "4",
-            "title": "Culinary Heritage",
-            "description": "Rich flavors and diverse cuisines - A gastronomic journey across Indian states",
-            "categories": ["Cuisine", "Culture", "Regional"],
-            "bg_color": "#ff965a",
-            "text_color": "#ffffff",
-            "image_url": "https://images.unsplash.com/photo-1565557623262-b51c2513a641?w=800&h=600&fit=crop",
-            "region": "Pan-India",
-            "is_active": True,
-            "sort_order": 4
-        },
-        {
-            "id": "5",
-            "title": "Traditional Crafts",
-            "description": "Handloom textiles, pottery, jewelry - Artisan skills passed down through generations",
-            "categories": ["Crafts", "Arts", "Heritage"],
-            "bg_color": "#78d692",
-            "text_color": "#151515",
-            "image_url": "https://images.unsplash.com/photo-1578662996442-48f60103fc96?w=800&h=600&fit=crop",
-            "region": "Rural India",
-            "is_active": True,
-            "sort_order": 5
-        }
-    ]
-    
-    # Sample cultural categories data
-    cultural_categories_sample = [
-        {
-            "id": "1",
-            "title": "Classical Arts",
-            "description": "Explore the timeless beauty of Indian classical music, dance, and performing arts that have captivated audiences for millennia.",
-            "bg_color": "#ffd1e7",
-            "text_color": "#151515",
-            "categories": ["Music", "Dance", "Theatre"],
-            "count_text": "12+ Forms",
-            "image_url": "https://images.unsplash.com/photo-1578662996442-48f60103fc96?w=400&h=300&fit=crop",
-            "is_featured": True,
-            "sort_order": 1
-        },
-        {
-            "id": "2",
-            "title": "Festivals & Celebrations",
-            "description": "Discover the vibrant tapestry of Indian festivals that celebrate seasons, harvests, and spiritual traditions.",
-            "bg_color": "#f6fd87",
-            "text_color": "#151515",
-            "categories": ["Festivals", "Traditions", "Spirituality"],
-            "count_text": "50+ Festivals",
-            "image_url": "https://images.unsplash.com/photo-1605379399642-870262d3d051?w=400&h=300&fit=crop",
-            "is_featured": True,
-            "sort_order": 2
-        },
-        {
-            "id": "3",
-            "title": "Architectural Wonders",
-            "description": "Journey through India's magnificent architectural heritage from ancient temples to Mughal monuments.",
-            "bg_color": "#b6cbcb",
-            "text_color": "#151515",
-            "categories": ["Architecture", "Heritage", "History"],
-            "count_text": "100+ Sites",
-            "image_url": "https://images.unsplash.com/photo-1564507592333-c60657eea523?w=400&h=300&fit=crop",
-            "is_featured": True,
-            "sort_order": 3
-        },
-        {
-            "id": "4",
-            "title": "Regional Cuisines",
-            "description": "Savor the diverse flavors and cooking traditions that vary dramatically across India's states and regions.",
-            "bg_color": "#b7fbff",
-            "text_color": "#151515",
-            "categories": ["Food", "Culture", "Regional"],
-            "count_text": "25+ Cuisines",
-            "image_url": "https://images.unsplash.com/photo-1565557623262-b51c2513a641?w=400&h=300&fit=crop",
-            "is_featured": True,
-            "sort_order": 4
-        },
-        {
-            "id": "5",
-            "title": "Traditional Crafts",
-            "description": "Appreciate the intricate craftsmanship of India's artisans through textiles, pottery, jewelry, and more.",
-            "bg_color": "#d987ff",
-            "text_color": "#ffffff",
-            "categories": ["Crafts", "Textiles", "Artisan"],
-            "count_text": "30+ Crafts",
-            "image_url": "https://images.unsplash.com/photo-1578662996442-48f60103fc96?w=400&h=300&fit=crop",
-            "is_featured": True,
-            "sort_order": 5
-        },
-        {
-            "id": "6",
-            "title": "Languages & Literature",
-            "description": "Explore India's linguistic diversity and rich literary traditions spanning ancient epics to modern works.",
-            "bg_color": "#88a2ff",
-            "text_color": "#ffffff",
-            "categories": ["Literature", "Languages", "Poetry"],
-            "count_text": "22+ Languages",
-            "image_url": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=300&fit=crop",
-            "is_featured": True,
-            "sort_order": 6
-        }
-    ]
-    
-    # Sample regional highlights data
-    regional_highlights_sample = [
-        {
-            "id": "1",
-            "region_name": "North India",
-            "states": ["Punjab", "Rajasthan", "Delhi", "Uttar Pradesh"],
-            "cultural_highlights": ["Punjabi Bhangra", "Rajasthani Folk Art", "Mughal Architecture", "Classical Music"],
-            "bg_color": "#ff84e4",
-            "text_color": "#151515",
-            "is_active": True,
-            "sort_order": 1
-        },
-        {
-            "id": "2",
-            "region_name": "South India",
-            "states": ["Tamil Nadu", "Kerala", "Karnataka", "Andhra Pradesh"],
-            "cultural_highlights": ["Bharatanatyam", "Ayurveda", "Temple Architecture", "Classical Music"],
-            "bg_color": "#78d692",
-            "text_color": "#151515",
-            "is_active": True,
-            "sort_order": 2
-        },
-        {
-            "id": "3",
-            "region_name": "East India",
-            "states": ["West Bengal", "Odisha", "Assam", "Jharkhand"],
-            "cultural_highlights": ["Durga Puja", "Odissi Dance", "Tea Culture", "Handicrafts"],
-            "bg_color": "#ffe03d",
-            "text_color": "#151515",
-            "is_active": True,
-            "sort_order": 3
-        },
-        {
-            "id": "4",
-            "region_name": "West India",
-            "states": ["Maharashtra", "Gujarat", "Goa", "Rajasthan"],
-            "cultural_highlights": ["Bollywood", "Garba Dance", "Portuguese Heritage", "Business Culture"],
-            "bg_color": "#d1903a",
-            "text_color": "#ffffff",
-            "is_active": True,
-            "sort_order": 4
-        }
+hero_slides_collection = LazyCollection("hero_slides")
+cultural_categories_collection = LazyCollection("cultural_categories")
+regional_highlights_collection = LazyCollection("regional_highlights")
+featured_stories_collection = LazyCollection("featured_stories")
+newsletter_subscribers_collection = LazyCollection("newsletter_subscribers")
+
+# Indexes backing the query shapes used by the routers. Each content collection
+# also has updated_at: cache_sync polls for the newest change when change
+# streams are unavailable
+INDEXES = {
+    "hero_slides": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("is_active", ASCENDING), ("sort_order", ASCENDING)]),
+        IndexModel([("updated_at", DESCENDING)]),
+    ],
+    "cultural_categories": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("sort_order", ASCENDING)]),
+        IndexModel([("is_featured", ASCENDING), ("sort_order", ASCENDING)]),
+        IndexModel([("updated_at", DESCENDING)]),
+    ],
+    "regional_highlights": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("is_active", ASCENDING), ("sort_order", ASCENDING)]),
+        IndexModel([("updated_at", DESCENDING)]),
+    ],
+    "featured_stories": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("published_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("is_featured", ASCENDING), ("published_at", DESCENDING)]),
+        IndexModel([("category_key", ASCENDING), ("published_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("updated_at", DESCENDING)]),
+        IndexModel(
+            [("title", TEXT), ("excerpt", TEXT), ("content", TEXT), ("category", TEXT), ("author", TEXT)],
+            weights={"title": 10, "excerpt": 5, "category": 5, "author": 3, "content": 1},
+            name="story_text",
+        ),
+    ],
+    "newsletter_subscribers": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("is_active", ASCENDING), ("subscribed_at", DESCENDING), ("id", DESCENDING)]),
+    ],
+}
+
+# (collection, filter, sort) for every query the routers issue
+QUERY_SHAPES = [
+    (hero_slides_collection, {"is_active": True}, [("sort_order", ASCENDING)]),
+    (hero_slides_collection, {"id": "1"}, None),
+    (hero_slides_collection, {}, [("updated_at", DESCENDING)]),
+    (cultural_categories_collection, {}, [("sort_order", ASCENDING)]),
+    (cultural_categories_collection, {"is_featured": True}, [("sort_order", ASCENDING)]),
+    (cultural_categories_collection, {"id": "1"}, None),
+    (cultural_categories_collection, {}, [("updated_at", DESCENDING)]),
+    (regional_highlights_collection, {"is_active": True}, [("sort_order", ASCENDING)]),
+    (regional_highlights_collection, {"id": "1"}, None),
+    (regional_highlights_collection, {}, [("updated_at", DESCENDING)]),
+    (featured_stories_collection, {"is_featured": True}, [("published_at", DESCENDING)]),
+    (featured_stories_collection, {}, [("published_at", DESCENDING), ("id", DESCENDING)]),
+    (featured_stories_collection, {"category_key": "festivals"}, [("published_at", DESCENDING), ("id", DESCENDING)]),
+    (featured_stories_collection, {"$text": {"$search": "festival"}}, None),
+    (featured_stories_collection, {"id": "1"}, None),
+    (featured_stories_collection, {}, [("updated_at", DESCENDING)]),
+    (newsletter_subscribers_collection, {"email": "someone@example.com"}, None),
+    (newsletter_subscribers_collection, {"is_active": True}, [("subscribed_at", DESCENDING), ("id", DESCENDING)]),
+]
+
+
+async def ensure_indexes():
+    """Create the indexes in INDEXES (no-op for ones that already exist)"""
+    for name, indexes in INDEXES.items():
+        await get_database()[name].create_indexes(indexes)
+
+
+async def missing_unique_indexes() -> List[str]:
+    """Unique indexes from INDEXES that don't exist yet, as "collection.index_name".
+
+    Duplicate-free upserts (newsletter emails, ids) depend on these.
+    """
+    names = list(INDEXES)
+    existing = await asyncio.gather(*(get_database()[name].index_information() for name in names))
+    return [
+        f"{name}.{index.document['name']}"
+        for name, present in zip(names, existing)
+        for index in INDEXES[name]
+        if index.document.get("unique") and index.document["name"] not in present
     ]
-    
-    # Sample featured stories data
-    featured_stories_sample = [
-        {
-            "id": "1",
-            "title": "The Art of Mehendi",
-            "excerpt": "Discover the intricate patterns and cultural significance of henna art in Indian weddings and celebrations.",
-            "content": "Mehendi, the ancient art of henna decoration, holds deep cultural significance in Indian traditions. This intricate body art form has been practiced for centuries, symbolizing joy, beauty, spiritual awakening, and offering. The elaborate patterns tell stories of love, prosperity, and new beginnings, making it an essential part of Indian celebrations.",
-            "category": "Traditional Arts",
-            "read_time": "5 min read",
-            "image_url": "https://images.unsplash.com/photo-1578662996442-48f60103fc96?w=300&h=200&fit=crop",
-            "author": "Cultural Heritage Team",
-            "is_featured": True
-        },
-        {
-            "id": "2",
-            "title": "Spice Routes of India",
-            "excerpt": "Journey through the historical trade routes that brought the world to India's doorstep.",
-            "content": "India's spice routes have shaped global trade and culture for millennia. From the Malabar Coast's black pepper to Kashmir's saffron, these aromatic treasures attracted merchants from across the world, creating a rich tapestry of cultural exchange and economic prosperity.",
-            "category": "History & Culture",
-            "read_time": "8 min read",
-            "image_url": "https://images.unsplash.com/photo-1565557623262-b51c2513a641?w=300&h=200&fit=crop",
-            "author": "Heritage Scholars",
-            "is_featured": True
-        },
-        {
-            "id": "3",
-            "title": "Monsoon Festivals",
-            "excerpt": "Celebrate the life-giving rains through India's monsoon festivals and traditions.",
-            "content": "The monsoon season brings not just life-giving rains to India, but also a celebration of renewal and abundance. From Teej in the north to Onam in the south, monsoon festivals across India celebrate the earth's rejuvenation and the promise of a good harvest.",
-            "category": "Festivals",
-            "read_time": "6 min read",
-            "image_url": "https://images.unsplash.com/photo-1605379399642-870262d3d051?w=300&h=200&fit=crop",
-            "author": "Festival Experts",
-            "is_featured": True
-        }
+
+
+async def dedupe_subscribers() -> int:
+    """Merge subscribers sharing an email so the unique email index can be built.
+
+    Keeps the oldest document. It stays active only if every copy was
+    active, so an unsubscribe recorded on any copy is honoured. Returns the
+    number of documents removed.
+    """
+    cursor = newsletter_subscribers_collection.aggregate([
+        {"$sort": {"subscribed_at": ASCENDING, "_id": ASCENDING}},
+        {"$group": {
+            "_id": "$email",
+            "ids": {"$push": "$_id"},
+            "is_active": {"$min": "$is_active"},
+        }},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ], allowDiskUse=True)
+    operations = []
+    removed = 0
+    async for group in cursor:
+        keep, *duplicates = group["ids"]
+        operations.append(UpdateOne({"_id": keep}, {"$set": {"is_active": bool(group["is_active"])}}))
+        operations.append(DeleteMany({"_id": {"$in": duplicates}}))
+        removed += len(duplicates)
+    if operations:
+        await newsletter_subscribers_collection.bulk_write(operations, ordered=False)
+    return removed
+
+
+async def backfill_category_keys():
+    """Add category_key to stories written before it existed"""
+    cursor = featured_stories_collection.find(
+        {"category_key": {"$exists": False}}, {"_id": 1, "category": 1}
+    )
+    updates = [
+        UpdateOne({"_id": story["_id"]}, {"$set": {"category_key": normalize_category(story.get("category", ""))}})
+        async for story in cursor
     ]
-    
-    # Initialize collections if empty
-    if await hero_slides_collection.count_documents({}) == 0:
-        await hero_slides_collection.insert_many(hero_slides_sample)
-        print("✓ Initialized hero slides collection")
-    
-    if await cultural_categories_collection.count_documents({}) == 0:
-        await cultural_categories_collection.insert_many(cultural_categories_sample)
-        print("✓ Initialized cultural categories collection")
-    
-    if await regional_highlights_collection.count_documents({}) == 0:
-        await regional_highlights_collection.insert_many(regional_highlights_sample)
-        print("✓ Initialized regional highlights collection")
-    
-    if await featured_stories_collection.count_documents({}) == 0:
-        await featured_stories_collection.insert_many(featured_stories_sample)
-        print("✓ Initialized featured stories collection")
+    if updates:
+        await featured_stories_collection.bulk_write(updates, ordered=False)
+
+
+async def _collection_stats(name: str) -> dict:
+    database = get_database()
+    documents, storage = await asyncio.gather(
+        database[name].estimated_document_count(),
+        database.command("collStats", name),
+        return_exceptions=True,
+    )
+    if isinstance(documents, Exception):
+        raise documents
+    if isinstance(storage, Exception):
+        # Counts are still useful when storage stats aren't available
+        return {"documents": documents, "storage_error": str(storage)}
+    return {
+        "documents": documents,
+        "size_bytes": storage.get("size"),
+        "storage_bytes": storage.get("storageSize"),
+        "index_bytes": storage.get("totalIndexSize"),
+        "indexes": storage.get("indexSizes", {}),
+    }
+
+
+async def collection_stats() -> dict:
+    """Document counts (from collection metadata) and storage/index sizes, all collections at once"""
+    names = list(INDEXES)
+    results = await asyncio.gather(*(_collection_stats(name) for name in names))
+    return dict(zip(names, results))
+
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []) + plan.get("shards", []):
+        yield from _plan_stages(child.get("winningPlan", child))
+
+
+async def verify_query_plans():
+    """Explain every query in QUERY_SHAPES and raise if any does a COLLSCAN"""
+    collection_scans = []
+    for collection, query, sort in QUERY_SHAPES:
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.explain()
+        if "COLLSCAN" in _plan_stages(explanation["queryPlanner"]["winningPlan"]):
+            collection_scans.append(f"{collection.name}: filter={query} sort={sort}")
+
+    if collection_scans:
+        raise RuntimeError("Queries without a supporting index: " + "; ".join(collection_scans))
 
 
 async def close_db_connection():
     """Close database connection"""
-    client.close()
\ No newline at end of file
+    global _client, _db, _read_db
+    if _client is not None:
+        _client.close()
+    _client = _db = _read_db = None
\ No newline at end of file
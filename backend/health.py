@@ -0,0 +1,73 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+from cache import cache_stats
+from database import get_database, pool_stats
+
+
+class ReadinessCheck:
+    """Pings MongoDB and reports pool and cache state, reusing the result briefly"""
+
+    def __init__(self, timeout: float = 0.5, interval: float = 2.0):
+        self.timeout = timeout
+        self.interval = interval
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _ping(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(get_database().command("ping"), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"ping timed out after {self.timeout}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+    @staticmethod
+    def _pool() -> Dict[str, Any]:
+        stats = pool_stats()
+        # maxPoolSize=0 means no limit, so there is nothing to saturate
+        saturation = round(stats["checked_out"] / stats["max_pool_size"], 4) if stats["max_pool_size"] else None
+        return {
+            "checked_out": stats["checked_out"],
+            "max_pool_size": stats["max_pool_size"],
+            "waiting": stats["waiting"],
+            "saturation": saturation,
+        }
+
+    @staticmethod
+    def _caches() -> Dict[str, Any]:
+        caches = {name: stats["entries"] for name, stats in cache_stats().items()}
+        return {
+            "warm": sum(1 for entries in caches.values() if entries),
+            "total": len(caches),
+            "entries": caches,
+        }
+
+    async def check(self) -> Dict[str, Any]:
+        async with self._lock:
+            # Probes arriving together share one ping
+            if self._result is not None and time.monotonic() - self._checked_at < self.interval:
+                return self._result
+
+            mongodb = await self._ping()
+            self._result = {
+                "status": "ready" if mongodb["ok"] else "unavailable",
+                "checks": {
+                    "mongodb": mongodb,
+                    "pool": self._pool(),
+                    "caches": self._caches(),
+                },
+            }
+            self._checked_at = time.monotonic()
+            return self._result
+
+
+readiness_check = ReadinessCheck(
+    timeout=float(os.environ.get("READINESS_TIMEOUT_MS", "500")) / 1000,
+    interval=float(os.environ.get("READINESS_CACHE_SECONDS", "2")),
+)
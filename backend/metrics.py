@@ -0,0 +1,205 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+from pymongo.monitoring import CommandListener
+
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Anything else is labelled OTHER; clients can send arbitrary method tokens
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in seconds"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; cumulated only when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def format_labels(**labels: str) -> str:
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return ",".join(escaped)
+
+
+def histogram_lines(name: str, histogram: Histogram, labels: str) -> List[str]:
+    prefix = labels + "," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+class RequestMetrics:
+    """Request counts and latencies per route template.
+
+    Only touched from the event loop, so no locking.
+    """
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram(REQUEST_BUCKETS)
+        histogram.observe(seconds)
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP http_requests_total HTTP requests by method, route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{{{format_labels(method=method, route=route, status=status)}}} {count}")
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency by method and route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines += histogram_lines("http_request_duration_seconds", histogram, format_labels(method=method, route=route))
+        return lines
+
+
+class CommandMetrics(CommandListener):
+    """Motor/pymongo command latencies per collection and command.
+
+    pymongo calls listeners from Motor's executor threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[object, int], str] = {}
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore names its cursor in the command and the collection separately
+        return event.command.get("collection", "") if event.command_name == "getMore" else ""
+
+    def started(self, event):
+        with self._lock:
+            self._in_flight[(event.connection_id, event.request_id)] = self._collection(event)
+
+    def _finished(self, event, failed: bool) -> None:
+        with self._lock:
+            collection = self._in_flight.pop((event.connection_id, event.request_id), "")
+            key = (collection, event.command_name)
+            histogram = self.durations.get(key)
+            if histogram is None:
+                histogram = self.durations[key] = Histogram(COMMAND_BUCKETS)
+            histogram.observe(event.duration_micros / 1_000_000)
+            if failed:
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP mongodb_command_duration_seconds MongoDB command latency by collection and command.",
+            "# TYPE mongodb_command_duration_seconds histogram",
+        ]
+        with self._lock:
+            durations = sorted(self.durations.items())
+            failures = sorted(self.failures.items())
+        for (collection, command), histogram in durations:
+            lines += histogram_lines(
+                "mongodb_command_duration_seconds", histogram, format_labels(collection=collection, command=command)
+            )
+        lines += [
+            "# HELP mongodb_command_failures_total Failed MongoDB commands by collection and command.",
+            "# TYPE mongodb_command_failures_total counter",
+        ]
+        for (collection, command), count in failures:
+            lines.append(
+                f"mongodb_command_failures_total{{{format_labels(collection=collection, command=command)}}} {count}"
+            )
+        return lines
+
+
+request_metrics = RequestMetrics()
+command_metrics = CommandMetrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request by its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in scope; unmatched paths share
+            # one label so random URLs can't grow the series count; likewise methods
+            route = scope.get("route")
+            method = scope["method"]
+            request_metrics.observe(
+                method if method in HTTP_METHODS else "OTHER",
+                route.path if route is not None else "unmatched",
+                status,
+                time.perf_counter() - start,
+            )
+
+
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """Include collector's exposition lines in every /metrics response"""
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    """Everything recorded so far, in the Prometheus text exposition format"""
+    lines = request_metrics.render() + command_metrics.render()
+    for collector in _collectors:
+        lines += collector()
+    return "\n".join(lines) + "\n"
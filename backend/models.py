@@ -96,6 +96,11 @@ class FeaturedStory(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+def normalize_category(category: str) -> str:
+    """Key stored alongside each story for exact, indexed category lookups"""
+    return " ".join(category.split()).lower()
+
+
 class FeaturedStoryCreate(BaseModel):
     title: str
     excerpt: str
@@ -118,6 +123,10 @@ class NewsletterSubscriberCreate(BaseModel):
     email: str
 
 
+class NewsletterBulkRequest(BaseModel):
+    emails: List[str] = Field(..., min_length=1, max_length=10000)
+
+
 # Response models for API
 class ApiResponse(BaseModel):
     message: str
@@ -130,4 +139,11 @@ class PaginatedResponse(BaseModel):
     total: int
     page: int = 1
     page_size: int = 100
-    success: bool = True
\ No newline at end of file
+    success: bool = True
+
+
+class CursorPaginatedResponse(BaseModel):
+    data: List[dict]
+    next_cursor: Optional[str] = None
+    limit: int = 50
+    success: bool = True
@@ -0,0 +1,77 @@
+import base64
+from datetime import datetime
+from typing import Optional, Type
+
+import orjson
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from rendering import RenderedPayload, render_json
+from tracing import span
+
+
+def encode_cursor(value: Optional[datetime], item_id: str) -> str:
+    """Opaque token for the position just after (value, item_id)"""
+    raw = orjson.dumps([value.isoformat() if value else None, item_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, item_id = orjson.loads(raw)
+        return (datetime.fromisoformat(value) if value else None), str(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_query(query: dict, field: str, cursor: Optional[str]) -> dict:
+    """Restrict query to documents after cursor in (field desc, id desc) order"""
+    if not cursor:
+        return query
+
+    value, item_id = decode_cursor(cursor)
+    if value is None:
+        # Documents without the field sort last; page through them by id only
+        after = {field: None, "id": {"$lt": item_id}}
+    else:
+        after = {"$or": [
+            {field: {"$lt": value}},
+            {field: value, "id": {"$lt": item_id}},
+            {field: None},
+        ]}
+    return {"$and": [query, after]} if query else after
+
+
+async def paginate(
+    collection,
+    query: dict,
+    field: str,
+    model: Type[BaseModel],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+) -> RenderedPayload:
+    """Fetch one page ordered by (field desc, id desc) and render it"""
+    if projection and any(projection.values()):
+        # The keyset fields are needed for the next cursor even if not returned
+        projection = {**projection, field: 1, "id": 1}
+    with span("db"):
+        documents = await collection.find(keyset_query(query, field, cursor), projection).sort(
+            [(field, -1), ("id", -1)]
+        ).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last.get(field), last["id"])
+
+    with span("model"):
+        items = [model(**document).dict() for document in documents]
+    return render_json({
+        "data": items,
+        "next_cursor": next_cursor,
+        "limit": limit,
+        "success": True,
+    })
@@ -0,0 +1,156 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import orjson
+from starlette.routing import Match
+
+from metrics import format_labels
+
+
+class RateLimit:
+    """rate requests per period seconds, allowing bursts of up to burst requests"""
+
+    __slots__ = ("rate", "period", "burst", "interval")
+
+    def __init__(self, rate: int, period: float = 60.0, burst: Optional[int] = None):
+        self.rate = rate
+        self.period = period
+        self.burst = burst or rate
+        # GCRA emission interval: one request is "paid back" every interval seconds
+        self.interval = period / rate
+
+
+class GCRATable:
+    """Generic cell rate algorithm state: one float (theoretical arrival time) per key.
+
+    Bounded to maxsize keys; the least recently seen key is evicted first,
+    which for a full table is almost always one whose allowance has fully
+    refilled, so evicting it changes nothing.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._tat: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def acquire(self, key: Hashable, limit: RateLimit, now: float) -> float:
+        """Take one request's allowance; returns 0 if allowed, else seconds until it would be"""
+        tat = self._tat.get(key, now)
+        new_tat = max(tat, now) + limit.interval
+        allowed_at = new_tat - limit.burst * limit.interval
+        if now < allowed_at:
+            self._tat.move_to_end(key)
+            return allowed_at - now
+
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.maxsize:
+            self._tat.popitem(last=False)
+            self.evictions += 1
+        return 0.0
+
+
+class RateLimiter:
+    """Per-client, per-route-template limits for write requests.
+
+    limits maps (method, route template) to a RateLimit; other write routes
+    get default (None disables it).
+    """
+
+    METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+    def __init__(
+        self,
+        default: Optional[RateLimit],
+        limits: Optional[Dict[Tuple[str, str], RateLimit]] = None,
+        maxsize: int = 100_000,
+    ):
+        self.default = default
+        self.limits = limits or {}
+        self.table = GCRATable(maxsize)
+        self.rejected: Dict[Tuple[str, str], int] = {}
+
+    def check(self, client: str, method: str, template: str) -> float:
+        """0 if the request may proceed, else seconds until it may be retried"""
+        limit = self.limits.get((method, template), self.default)
+        if limit is None:
+            return 0.0
+        retry_after = self.table.acquire((client, method, template), limit, time.monotonic())
+        if retry_after:
+            self.rejected[(method, template)] = self.rejected.get((method, template), 0) + 1
+        return retry_after
+
+    def render_metrics(self) -> List[str]:
+        lines = [
+            "# HELP rate_limit_rejected_total Requests refused with 429, by method and route template.",
+            "# TYPE rate_limit_rejected_total counter",
+        ]
+        for (method, route), count in sorted(self.rejected.items()):
+            lines.append(f"rate_limit_rejected_total{{{format_labels(method=method, route=route)}}} {count}")
+        lines += [
+            "# HELP rate_limit_tracked_clients Client/route pairs in the rate limit table.",
+            "# TYPE rate_limit_tracked_clients gauge",
+            f"rate_limit_tracked_clients {len(self.table)}",
+            "# HELP rate_limit_evictions_total Least recently seen entries dropped from the full table.",
+            "# TYPE rate_limit_evictions_total counter",
+            f"rate_limit_evictions_total {self.table.evictions}",
+        ]
+        return lines
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware answering 429 with Retry-After when limiter refuses a write.
+
+    GET/HEAD/OPTIONS pass straight through. For writes, the route template
+    is resolved against router because routing hasn't happened yet. The
+    client is scope["client"]; behind a load balancer, run uvicorn with
+    --proxy-headers so that is the real client address.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, router):
+        self.app = app
+        self.limiter = limiter
+        self.router = router
+
+    def _route(self, scope):
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in RateLimiter.METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = self.limiter.check(client[0] if client else "", scope["method"], route.path)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        # Lets the metrics middleware label the 429 with its route
+        scope["route"] = route
+        seconds = math.ceil(retry_after)
+        body = orjson.dumps({"detail": f"Too many requests, retry in {seconds} seconds"})
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(seconds).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
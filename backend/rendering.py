@@ -0,0 +1,189 @@
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware as StarletteGZipMiddleware
+
+from tracing import span
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+
+# Bodies smaller than this aren't worth the Content-Encoding overhead
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "500"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "6"))
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    with span("compress"):
+        if encoding == "br":
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class RenderedPayload:
+    """JSON body rendered once per data change, with its cache validators.
+
+    Compressed variants are made on first request and kept alongside the
+    body, so a cached payload is compressed once per encoding.
+    """
+
+    __slots__ = ("body", "etag", "last_modified", "_variants")
+
+    def __init__(self, body: bytes, last_modified: Optional[datetime] = None):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        # HTTP dates have one-second resolution
+        self.last_modified = last_modified.replace(microsecond=0) if last_modified else None
+        self._variants = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """The body compressed with encoding ("gzip" or "br")"""
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = _compress(self.body, encoding)
+        return variant
+
+
+def _latest_update(items: Iterable[dict]) -> Optional[datetime]:
+    return max((item["updated_at"] for item in items if item.get("updated_at")), default=None)
+
+
+def render_json(data: Any, last_modified: Optional[datetime] = None) -> RenderedPayload:
+    with span("serialize"):
+        return RenderedPayload(orjson.dumps(data), last_modified)
+
+
+def render_model(model: Type[BaseModel], document: dict) -> RenderedPayload:
+    with span("model"):
+        item = model(**document).dict()
+    return render_json(item, _latest_update([item]))
+
+
+def render_models(
+    model: Type[BaseModel], documents: Iterable[dict], last_written: Optional[datetime] = None
+) -> RenderedPayload:
+    """Build each document through its model once and render the list.
+
+    The rows' updated_at can't see rows that were deleted or filtered out,
+    so Last-Modified is also at least last_written, the collection's last
+    write time.
+    """
+    with span("model"):
+        items = [model(**document).dict() for document in documents]
+    latest = _latest_update(items)
+    if last_written and (latest is None or last_written > latest):
+        latest = last_written
+    return render_json(items, latest)
+
+
+def negotiate_encoding(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """The coding in available the client ranks highest (earlier ones win ties), or None for identity"""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    # Only an explicit identity preference outranks compression
+    if best is not None and qualities.get("identity", 0.0) > best_quality:
+        return None
+    return best
+
+
+# Preferred first: br compresses JSON better than gzip at similar cost
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _encoding_for(request: Request, payload: RenderedPayload) -> Optional[str]:
+    """Best content coding the client accepts for this payload, or None for identity"""
+    if len(payload.body) < COMPRESS_MIN_BYTES:
+        return None
+    return negotiate_encoding(request.headers.get("accept-encoding", ""), ENCODINGS)
+
+
+class GZipMiddleware(StarletteGZipMiddleware):
+    """Starlette's GZipMiddleware, but only when the client accepts gzip with q > 0.
+
+    Starlette only checks that "gzip" appears in Accept-Encoding, so
+    "gzip;q=0" would still get a gzipped body.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), ("gzip",)
+        ) is None:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def _variant_etag(etag: str, encoding: Optional[str]) -> str:
+    # Each representation needs its own strong validator
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _not_modified(request: Request, payload: RenderedPayload) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.1.3)
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        # Any encoding of the same body is equally current
+        return "*" in tags or any(_variant_etag(payload.etag, encoding) in tags for encoding in (None, "gzip", "br"))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and payload.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return payload.last_modified.replace(tzinfo=timezone.utc) <= since
+
+    return False
+
+
+def payload_response(request: Request, payload: RenderedPayload) -> Response:
+    """Send a rendered payload, compressed if the client accepts it, or 304 if the client's copy is current"""
+    encoding = _encoding_for(request, payload)
+    headers = {
+        "ETag": _variant_etag(payload.etag, encoding),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if payload.last_modified:
+        headers["Last-Modified"] = format_datetime(
+            payload.last_modified.replace(tzinfo=timezone.utc), usegmt=True
+        )
+
+    if _not_modified(request, payload):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return Response(content=payload.encoded(encoding), media_type="application/json", headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
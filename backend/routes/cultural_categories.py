@@ -1,101 +1,45 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from models import CulturalCategory, CulturalCategoryCreate, ApiResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Optional, Tuple
+from models import CulturalCategory, CulturalCategoryCreate
 from database import cultural_categories_collection
-from datetime import datetime
+from crud import FIELDS_DESCRIPTION, CrudRepository, register_crud_routes, select_fields
+from rendering import RenderedPayload, payload_response
+import os
 
 router = APIRouter(prefix="/cultural-categories", tags=["Cultural Categories"])
+cultural_categories_repository = CrudRepository(
+    "cultural_categories",
+    cultural_categories_collection,
+    CulturalCategory,
+    CulturalCategoryCreate,
+    list_sort=[("sort_order", 1)],
+    stale_ttl=float(os.environ.get("CULTURAL_CATEGORIES_STALE_TTL_SECONDS", "300")),
+)
 
 
-@router.get("/", response_model=List[CulturalCategory])
-async def get_cultural_categories():
-    """Get all cultural categories sorted by sort_order"""
-    try:
-        cursor = cultural_categories_collection.find({}).sort("sort_order", 1)
-        categories = await cursor.to_list(length=None)
-        return [CulturalCategory(**category) for category in categories]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching cultural categories: {str(e)}")
+async def featured_cultural_categories(fields: Optional[Tuple[str, ...]] = None) -> RenderedPayload:
+    return await cultural_categories_repository.list(
+        "featured", {"is_featured": True}, [("sort_order", 1)], fields
+    )
 
 
 @router.get("/featured", response_model=List[CulturalCategory])
-async def get_featured_cultural_categories():
+async def get_featured_cultural_categories(
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
     """Get only featured cultural categories"""
+    selected = select_fields(CulturalCategory, fields)
     try:
-        cursor = cultural_categories_collection.find(
-            {"is_featured": True}
-        ).sort("sort_order", 1)
-        
-        categories = await cursor.to_list(length=None)
-        return [CulturalCategory(**category) for category in categories]
+        return payload_response(request, await featured_cultural_categories(selected))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching featured categories: {str(e)}")
 
 
-@router.get("/{category_id}", response_model=CulturalCategory)
-async def get_cultural_category(category_id: str):
-    """Get a specific cultural category by ID"""
-    try:
-        category = await cultural_categories_collection.find_one({"id": category_id})
-        if not category:
-            raise HTTPException(status_code=404, detail="Cultural category not found")
-        return CulturalCategory(**category)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching cultural category: {str(e)}")
-
-
-@router.post("/", response_model=CulturalCategory)
-async def create_cultural_category(category: CulturalCategoryCreate):
-    """Create a new cultural category"""
-    try:
-        category_dict = category.dict()
-        category_obj = CulturalCategory(**category_dict)
-        
-        await cultural_categories_collection.insert_one(category_obj.dict())
-        return category_obj
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating cultural category: {str(e)}")
-
-
-@router.put("/{category_id}", response_model=CulturalCategory)
-async def update_cultural_category(category_id: str, category_update: CulturalCategoryCreate):
-    """Update an existing cultural category"""
-    try:
-        existing_category = await cultural_categories_collection.find_one({"id": category_id})
-        if not existing_category:
-            raise HTTPException(status_code=404, detail="Cultural category not found")
-        
-        update_dict = category_update.dict()
-        update_dict["updated_at"] = datetime.utcnow()
-        
-        await cultural_categories_collection.update_one(
-            {"id": category_id},
-            {"$set": update_dict}
-        )
-        
-        updated_category = await cultural_categories_collection.find_one({"id": category_id})
-        return CulturalCategory(**updated_category)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating cultural category: {str(e)}")
-
-
-@router.delete("/{category_id}", response_model=ApiResponse)
-async def delete_cultural_category(category_id: str):
-    """Delete a cultural category"""
-    try:
-        result = await cultural_categories_collection.delete_one({"id": category_id})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Cultural category not found")
-        
-        return ApiResponse(message="Cultural category deleted successfully")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting cultural category: {str(e)}")
\ No newline at end of file
+register_crud_routes(
+    router,
+    cultural_categories_repository,
+    singular="cultural category",
+    plural="cultural categories",
+    list_description="Get all cultural categories sorted by sort_order",
+)
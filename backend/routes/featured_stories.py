@@ -1,115 +1,144 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from models import FeaturedStory, FeaturedStoryCreate, ApiResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+from models import (
+    FeaturedStory,
+    FeaturedStoryCreate,
+    CursorPaginatedResponse,
+    PaginatedResponse,
+    normalize_category,
+)
 from database import featured_stories_collection
-from datetime import datetime
+from crud import (
+    FIELDS_DESCRIPTION,
+    CrudRepository,
+    register_crud_routes,
+    select_fields,
+    trimmed_model,
+)
+from cache import TTLCache
+from rendering import render_json, payload_response
+from tracing import span
+import asyncio
+import os
 
 router = APIRouter(prefix="/featured-stories", tags=["Featured Stories"])
+featured_stories_repository = CrudRepository(
+    "featured_stories",
+    featured_stories_collection,
+    FeaturedStory,
+    FeaturedStoryCreate,
+    extra_fields=lambda story: {"category_key": normalize_category(story.category)},
+    list_query={"is_featured": True},
+    list_sort=[("published_at", -1)],
+    # Listings render cards; the article body is only needed on the story page
+    list_exclude=("content",),
+    # Writes invalidate immediately; this only bridges TTL expiry under load
+    stale_ttl=float(os.environ.get("FEATURED_STORIES_STALE_TTL_SECONDS", "60")),
+)
 
+SEARCH_MAX_TIME_MS = 2000
 
-@router.get("/", response_model=List[FeaturedStory])
-async def get_featured_stories():
-    """Get all featured stories sorted by published_at (newest first)"""
-    try:
-        cursor = featured_stories_collection.find(
-            {"is_featured": True}
-        ).sort("published_at", -1)
-        
-        stories = await cursor.to_list(length=None)
-        return [FeaturedStory(**story) for story in stories]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching featured stories: {str(e)}")
+# Separate from the repository cache so a stream of distinct queries can't
+# evict the listings; not registered with get_cache(), so it stays out of
+# readiness cache warmth
+search_cache = TTLCache(
+    "featured_stories_search",
+    ttl=float(os.environ.get("CACHE_TTL_SECONDS", "300")),
+    maxsize=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "128")),
+)
+featured_stories_repository.on_write(search_cache.invalidate)
 
 
-@router.get("/all", response_model=List[FeaturedStory])
-async def get_all_stories():
-    """Get all stories (featured and non-featured)"""
+@router.get("/all", response_model=CursorPaginatedResponse)
+async def get_all_stories(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """Get all stories (featured and non-featured), newest first, one page at a time"""
+    selected = select_fields(FeaturedStory, fields, featured_stories_repository.list_exclude)
     try:
-        cursor = featured_stories_collection.find({}).sort("published_at", -1)
-        stories = await cursor.to_list(length=None)
-        return [FeaturedStory(**story) for story in stories]
+        payload = await featured_stories_repository.page("all", {}, "published_at", limit, cursor, selected)
+        return payload_response(request, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching all stories: {str(e)}")
 
 
-@router.get("/category/{category}", response_model=List[FeaturedStory])
-async def get_stories_by_category(category: str):
-    """Get stories by category"""
+@router.get("/category/{category}", response_model=CursorPaginatedResponse)
+async def get_stories_by_category(
+    request: Request,
+    category: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """Get stories by category, newest first, one page at a time"""
+    category_key = normalize_category(category)
+    selected = select_fields(FeaturedStory, fields, featured_stories_repository.list_exclude)
     try:
-        cursor = featured_stories_collection.find(
-            {"category": {"$regex": category, "$options": "i"}}
-        ).sort("published_at", -1)
-        
-        stories = await cursor.to_list(length=None)
-        return [FeaturedStory(**story) for story in stories]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching stories by category: {str(e)}")
-
-
-@router.get("/{story_id}", response_model=FeaturedStory)
-async def get_story(story_id: str):
-    """Get a specific story by ID"""
-    try:
-        story = await featured_stories_collection.find_one({"id": story_id})
-        if not story:
-            raise HTTPException(status_code=404, detail="Story not found")
-        return FeaturedStory(**story)
+        payload = await featured_stories_repository.page(
+            ("category", category_key), {"category_key": category_key}, "published_at", limit, cursor, selected
+        )
+        return payload_response(request, payload)
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching story: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching stories by category: {str(e)}")
 
 
-@router.post("/", response_model=FeaturedStory)
-async def create_story(story: FeaturedStoryCreate):
-    """Create a new story"""
-    try:
-        story_dict = story.dict()
-        story_obj = FeaturedStory(**story_dict)
-        
-        await featured_stories_collection.insert_one(story_obj.dict())
-        return story_obj
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating story: {str(e)}")
+@router.get("/search", response_model=PaginatedResponse)
+async def search_stories(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1, le=50),
+    page_size: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """Full-text search over title, excerpt, content, category and author, best matches first"""
+    # $text matching ignores case, so "Festival " and "festival" share a cache entry
+    terms = q.strip().casefold()
+    query = {"$text": {"$search": terms}}
+    selected = select_fields(FeaturedStory, fields, featured_stories_repository.list_exclude)
+    model = trimmed_model(FeaturedStory, selected)
+    projection = {"_id": 0, "score": {"$meta": "textScore"}}
+    if selected:
+        projection.update({name: 1 for name in selected})
 
+    async def load():
+        async with featured_stories_repository.timed("search"):
+            cursor = featured_stories_collection.find(query, projection).sort(
+                [("score", {"$meta": "textScore"}), ("published_at", -1)]
+            ).skip((page - 1) * page_size).limit(page_size).max_time_ms(SEARCH_MAX_TIME_MS)
+
+            with span("db"):
+                stories, total = await asyncio.gather(
+                    cursor.to_list(length=page_size),
+                    featured_stories_collection.count_documents(query, maxTimeMS=SEARCH_MAX_TIME_MS),
+                )
+        with span("model"):
+            items = [{**model(**story).dict(), "score": story["score"]} for story in stories]
+        return render_json({
+            "data": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "success": True,
+        })
 
-@router.put("/{story_id}", response_model=FeaturedStory)
-async def update_story(story_id: str, story_update: FeaturedStoryCreate):
-    """Update an existing story"""
     try:
-        existing_story = await featured_stories_collection.find_one({"id": story_id})
-        if not existing_story:
-            raise HTTPException(status_code=404, detail="Story not found")
-        
-        update_dict = story_update.dict()
-        update_dict["updated_at"] = datetime.utcnow()
-        
-        await featured_stories_collection.update_one(
-            {"id": story_id},
-            {"$set": update_dict}
-        )
-        
-        updated_story = await featured_stories_collection.find_one({"id": story_id})
-        return FeaturedStory(**updated_story)
-    except HTTPException:
-        raise
+        payload = await search_cache.get_or_load((terms, page, page_size, selected), load)
+        return payload_response(request, payload)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating story: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching stories: {str(e)}")
 
 
-@router.delete("/{story_id}", response_model=ApiResponse)
-async def delete_story(story_id: str):
-    """Delete a story"""
-    try:
-        result = await featured_stories_collection.delete_one({"id": story_id})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Story not found")
-        
-        return ApiResponse(message="Story deleted successfully")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting story: {str(e)}")
\ No newline at end of file
+register_crud_routes(
+    router,
+    featured_stories_repository,
+    singular="story",
+    plural="featured stories",
+    list_description="Get all featured stories sorted by published_at (newest first)",
+)
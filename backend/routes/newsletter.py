@@ -1,57 +1,148 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from models import (
+    NewsletterSubscriber,
+    NewsletterSubscriberCreate,
+    NewsletterBulkRequest,
+    ApiResponse,
+    CursorPaginatedResponse,
+)
+from database import newsletter_subscribers_collection
+from rendering import render_json, payload_response
+from pagination import decode_cursor, encode_cursor, paginate
+from crud import FIELDS_DESCRIPTION, projection_for, select_fields, trimmed_model
+from metrics import register_collector
+from signup_queue import SignupQueue
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from datetime import datetime
+from pathlib import Path
 from typing import List
-import sys
+import csv
+import io
+import orjson
 import os
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from models import NewsletterSubscriber, NewsletterSubscriberCreate, ApiResponse
-from database import newsletter_subscribers_collection
 import re
 
 router = APIRouter(prefix="/newsletter", tags=["Newsletter"])
 
+EXPORT_FIELDS = ["id", "email", "is_active", "subscribed_at"]
+EXPORT_BATCH_SIZE = 1000
+
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 
 def is_valid_email(email: str) -> bool:
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
+
+
+def _partition_emails(emails: List[str]):
+    """Split raw emails into per-item results and the unique valid addresses to write"""
+    match = EMAIL_PATTERN.match
+    results = []
+    unique = {}
+    for raw in emails:
+        if match(raw) is None:
+            results.append({"email": raw, "status": "invalid"})
+            continue
+        email = raw.lower()
+        if email in unique:
+            results.append({"email": email, "status": "duplicate"})
+            continue
+        unique[email] = len(results)
+        results.append({"email": email, "status": None})
+    return results, unique
+
+
+def _subscribe_update(email: str) -> dict:
+    """Upsert document that activates email, creating the subscriber if needed"""
+    subscriber = NewsletterSubscriber(email=email).dict()
+    del subscriber["is_active"]
+    return {"$set": {"is_active": True}, "$setOnInsert": subscriber}
+
+
+async def bulk_upsert_subscribers(emails: List[str]) -> dict:
+    """Activate every email with one unordered bulk_write of upserts; returns the raw bulk result"""
+    operations = [UpdateOne({"email": email}, _subscribe_update(email), upsert=True) for email in emails]
+    try:
+        result = await newsletter_subscribers_collection.bulk_write(operations, ordered=False)
+        return result.bulk_api_result
+    except BulkWriteError as e:
+        return e.details
+
+
+# Write-behind mode: signups are acknowledged once queued and written in batches
+NEWSLETTER_WRITE_BEHIND = os.environ.get("NEWSLETTER_WRITE_BEHIND", "false").lower() == "true"
+signup_queue = SignupQueue(
+    bulk_upsert_subscribers,
+    maxsize=int(os.environ.get("NEWSLETTER_QUEUE_SIZE", "10000")),
+    batch_size=int(os.environ.get("NEWSLETTER_BATCH_SIZE", "500")),
+    flush_interval=float(os.environ.get("NEWSLETTER_FLUSH_INTERVAL_MS", "50")) / 1000,
+    # Relative paths are relative to backend/
+    failures_path=Path(__file__).resolve().parent.parent
+    / os.environ.get("NEWSLETTER_FAILURES_FILE", "newsletter_signup_failures.ndjson"),
+)
+register_collector(signup_queue.render_metrics)
+QUEUE_FULL_RETRY_AFTER = "5"
 
 
 @router.post("/subscribe", response_model=ApiResponse)
-async def subscribe_to_newsletter(subscriber: NewsletterSubscriberCreate):
+async def subscribe_to_newsletter(subscriber: NewsletterSubscriberCreate, response: Response):
     """Subscribe to newsletter"""
     try:
         # Validate email format
         if not is_valid_email(subscriber.email):
             raise HTTPException(status_code=400, detail="Invalid email format")
         
-        # Check if email already exists
-        existing_subscriber = await newsletter_subscribers_collection.find_one(
-            {"email": subscriber.email.lower()}
-        )
-        
-        if existing_subscriber:
-            if existing_subscriber.get("is_active", True):
-                return ApiResponse(
-                    message="Email already subscribed to newsletter",
-                    success=True
-                )
-            else:
-                # Reactivate subscription
-                await newsletter_subscribers_collection.update_one(
-                    {"email": subscriber.email.lower()},
-                    {"$set": {"is_active": True}}
-                )
-                return ApiResponse(
-                    message="Newsletter subscription reactivated successfully",
-                    success=True
+        email = subscriber.email.lower()
+        if NEWSLETTER_WRITE_BEHIND:
+            if not signup_queue.submit(email):
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many subscriptions right now, please try again shortly",
+                    headers={"Retry-After": QUEUE_FULL_RETRY_AFTER},
                 )
+            response.status_code = 202
+            return ApiResponse(
+                message="Newsletter subscription received",
+                success=True
+            )
         
-        # Create new subscription
-        subscriber_obj = NewsletterSubscriber(email=subscriber.email.lower())
-        await newsletter_subscribers_collection.insert_one(subscriber_obj.dict())
+        # One atomic upsert; the pre-image tells us which case we were in
+        try:
+            previous = await newsletter_subscribers_collection.find_one_and_update(
+                {"email": email},
+                _subscribe_update(email),
+                projection={"_id": 0, "is_active": 1},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # Lost an insert race on the unique email index; the document exists now
+            previous = await newsletter_subscribers_collection.find_one_and_update(
+                {"email": email},
+                {"$set": {"is_active": True}},
+                projection={"_id": 0, "is_active": 1},
+                return_document=ReturnDocument.BEFORE,
+            )
+        
+        if previous is None:
+            return ApiResponse(
+                message="Successfully subscribed to newsletter",
+                success=True
+            )
+        
+        if previous.get("is_active", True):
+            return ApiResponse(
+                message="Email already subscribed to newsletter",
+                success=True
+            )
         
         return ApiResponse(
-            message="Successfully subscribed to newsletter",
+            message="Newsletter subscription reactivated successfully",
             success=True
         )
     except HTTPException:
@@ -60,18 +151,68 @@ async def subscribe_to_newsletter(subscriber: NewsletterSubscriberCreate):
         raise HTTPException(status_code=500, detail=f"Error subscribing to newsletter: {str(e)}")
 
 
+@router.get("/queue")
+async def get_signup_queue_stats():
+    """Depth and counters of the write-behind signup queue"""
+    return {"enabled": NEWSLETTER_WRITE_BEHIND, **signup_queue.stats()}
+
+
+@router.post("/subscribe/bulk", response_model=ApiResponse)
+async def bulk_subscribe_to_newsletter(request: NewsletterBulkRequest):
+    """Subscribe many emails at once (partner list imports)"""
+    try:
+        results, unique = _partition_emails(request.emails)
+        emails = list(unique)
+        outcome = await bulk_upsert_subscribers(emails) if emails else {}
+
+        upserted = {entry["index"] for entry in outcome.get("upserted", [])}
+        failed = {error["index"]: error.get("errmsg", "write failed") for error in outcome.get("writeErrors", [])}
+        for index, email in enumerate(emails):
+            item = results[unique[email]]
+            if index in failed:
+                item.update(status="error", detail=failed[index])
+            else:
+                item["status"] = "subscribed" if index in upserted else "existing"
+
+        modified = outcome.get("nModified", 0)
+        summary = {
+            "received": len(request.emails),
+            "invalid": sum(1 for item in results if item["status"] == "invalid"),
+            "duplicates": sum(1 for item in results if item["status"] == "duplicate"),
+            "subscribed": len(upserted),
+            "reactivated": modified,
+            "already_subscribed": outcome.get("nMatched", 0) - modified,
+            "errors": len(failed),
+        }
+        return ApiResponse(
+            message=f"Processed {len(request.emails)} newsletter subscriptions",
+            data={"summary": summary, "results": results},
+            success=not failed,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error bulk subscribing to newsletter: {str(e)}")
+
+
 @router.post("/unsubscribe", response_model=ApiResponse)
 async def unsubscribe_from_newsletter(subscriber: NewsletterSubscriberCreate):
     """Unsubscribe from newsletter"""
     try:
-        result = await newsletter_subscribers_collection.update_one(
+        previous = await newsletter_subscribers_collection.find_one_and_update(
             {"email": subscriber.email.lower()},
-            {"$set": {"is_active": False}}
+            {"$set": {"is_active": False}},
+            projection={"_id": 0, "is_active": 1},
+            return_document=ReturnDocument.BEFORE,
         )
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Email not found in newsletter subscriptions")
         
+        if not previous.get("is_active", True):
+            return ApiResponse(
+                message="Email already unsubscribed from newsletter",
+                success=True
+            )
+        
         return ApiResponse(
             message="Successfully unsubscribed from newsletter",
             success=True
@@ -82,25 +223,150 @@ async def unsubscribe_from_newsletter(subscriber: NewsletterSubscriberCreate):
         raise HTTPException(status_code=500, detail=f"Error unsubscribing from newsletter: {str(e)}")
 
 
-@router.get("/subscribers", response_model=List[NewsletterSubscriber])
-async def get_newsletter_subscribers():
-    """Get all active newsletter subscribers (admin only)"""
+@router.post("/unsubscribe/bulk", response_model=ApiResponse)
+async def bulk_unsubscribe_from_newsletter(request: NewsletterBulkRequest):
+    """Unsubscribe many emails at once"""
     try:
-        cursor = newsletter_subscribers_collection.find(
-            {"is_active": True}
-        ).sort("subscribed_at", -1)
-        
-        subscribers = await cursor.to_list(length=None)
-        return [NewsletterSubscriber(**subscriber) for subscriber in subscribers]
+        results, unique = _partition_emails(request.emails)
+        emails = list(unique)
+        known = set()
+        if emails:
+            cursor = newsletter_subscribers_collection.find(
+                {"email": {"$in": emails}}, {"_id": 0, "email": 1}
+            )
+            known = {subscriber["email"] async for subscriber in cursor}
+            await newsletter_subscribers_collection.update_many(
+                {"email": {"$in": list(known)}},
+                {"$set": {"is_active": False}}
+            )
+
+        for email, position in unique.items():
+            results[position]["status"] = "unsubscribed" if email in known else "not_found"
+
+        summary = {
+            "received": len(request.emails),
+            "invalid": sum(1 for item in results if item["status"] == "invalid"),
+            "duplicates": sum(1 for item in results if item["status"] == "duplicate"),
+            "unsubscribed": len(known),
+            "not_found": len(emails) - len(known),
+        }
+        return ApiResponse(
+            message=f"Processed {len(request.emails)} newsletter unsubscriptions",
+            data={"summary": summary, "results": results},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error bulk unsubscribing from newsletter: {str(e)}")
+
+
+@router.get("/subscribers", response_model=CursorPaginatedResponse)
+async def get_newsletter_subscribers(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """Get active newsletter subscribers, newest first, one page at a time (admin only)"""
+    selected = select_fields(NewsletterSubscriber, fields)
+    try:
+        page = await paginate(
+            newsletter_subscribers_collection.reader,
+            {"is_active": True},
+            "subscribed_at",
+            trimmed_model(NewsletterSubscriber, selected),
+            limit,
+            cursor,
+            projection_for(selected),
+        )
+        return payload_response(request, page)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching newsletter subscribers: {str(e)}")
 
 
 @router.get("/subscribers/count", response_model=dict)
-async def get_subscriber_count():
+async def get_subscriber_count(request: Request):
     """Get count of active subscribers"""
     try:
-        count = await newsletter_subscribers_collection.count_documents({"is_active": True})
-        return {"active_subscribers": count}
+        count = await newsletter_subscribers_collection.reader.count_documents({"is_active": True})
+        return payload_response(request, render_json({"active_subscribers": count}))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting subscriber count: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error getting subscriber count: {str(e)}")
+
+
+def _csv_line(values: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue().encode()
+
+
+def _export_line(subscriber: dict, export_format: str) -> bytes:
+    subscribed_at = subscriber.get("subscribed_at")
+    # Pass the last row's cursor as ?after= to resume an interrupted export
+    cursor = encode_cursor(subscribed_at, subscriber.get("id", ""))
+    if export_format == "ndjson":
+        return orjson.dumps({**subscriber, "cursor": cursor}) + b"\n"
+
+    return _csv_line([
+        subscriber.get("id", ""),
+        subscriber.get("email", ""),
+        subscriber.get("is_active", True),
+        subscribed_at.isoformat() if subscribed_at else "",
+        cursor,
+    ])
+
+
+def _export_after(after: str) -> dict:
+    """Rows strictly after the cursor in (subscribed_at asc, id asc) order"""
+    value, item_id = decode_cursor(after)
+    if value is None:
+        # Rows without subscribed_at sort first
+        return {"$or": [{"subscribed_at": None, "id": {"$gt": item_id}}, {"subscribed_at": {"$ne": None}}]}
+    return {"$or": [
+        {"subscribed_at": {"$gt": value}},
+        {"subscribed_at": value, "id": {"$gt": item_id}},
+    ]}
+
+
+async def _export_rows(query: dict, export_format: str) -> AsyncIterator[bytes]:
+    """Yield subscriber rows one cursor batch at a time, oldest first"""
+    cursor = newsletter_subscribers_collection.reader.find(
+        query, {"_id": 0, **{field: 1 for field in EXPORT_FIELDS}}
+    ).sort([("subscribed_at", 1), ("id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+
+    lines = [_csv_line([*EXPORT_FIELDS, "cursor"])] if export_format == "csv" else []
+    async for subscriber in cursor:
+        lines.append(_export_line(subscriber, export_format))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield b"".join(lines)
+            lines.clear()
+
+    if lines:
+        yield b"".join(lines)
+
+
+@router.get("/subscribers/export")
+async def export_newsletter_subscribers(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = Query(None, description="Only export subscribers with subscribed_at >= since"),
+    after: Optional[str] = Query(
+        None,
+        description="Resume an interrupted export: the cursor of the last row received. "
+                    "Rows continue from exactly the next one, with no repeats.",
+    ),
+):
+    """Stream active subscribers as NDJSON or CSV with constant memory (admin only)"""
+    conditions = [{"is_active": True}]
+    if since:
+        conditions.append({"subscribed_at": {"$gte": since}})
+    if after:
+        # Decoded here so a bad cursor is a 400, not a broken stream
+        conditions.append(_export_after(after))
+    query = conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(query, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="newsletter-subscribers.{export_format}"'},
+    )
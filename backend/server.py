@@ -1,23 +1,51 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import time
+import asyncio
 import logging
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Worker time-to-ready is measured from here
+PROCESS_STARTED = time.perf_counter()
 
 # Import database initialization
-from database import init_database, close_db_connection
+from database import (
+    connect_to_database,
+    get_database,
+    pool_stats,
+    collection_stats,
+    missing_unique_indexes,
+    verify_query_plans,
+    close_db_connection,
+)
+from cache import TTLCache, cache_stats
+from cache_sync import CacheSync
+from crud import repository_stats, select_fields
+from health import readiness_check
+from metrics import MetricsMiddleware, register_collector, render_metrics
+from ratelimit import RateLimit, RateLimiter, RateLimitMiddleware
+from tracing import TracingMiddleware
+from rendering import COMPRESS_MIN_BYTES, GZIP_LEVEL, GZipMiddleware, RenderedPayload, payload_response
 
 # Import routes modules
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
-from routes.hero_slides import router as hero_slides_router
-from routes.cultural_categories import router as cultural_categories_router  
-from routes.regional_highlights import router as regional_highlights_router
-from routes.featured_stories import router as featured_stories_router
-from routes.newsletter import router as newsletter_router
+from routes.hero_slides import router as hero_slides_router, hero_slides_repository
+from routes.cultural_categories import (
+    router as cultural_categories_router,
+    cultural_categories_repository,
+    featured_cultural_categories,
+)
+from routes.regional_highlights import router as regional_highlights_router, regional_highlights_repository
+from routes.featured_stories import router as featured_stories_router, featured_stories_repository
+from routes.newsletter import router as newsletter_router, NEWSLETTER_WRITE_BEHIND, signup_queue
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -37,9 +65,149 @@ api_router = APIRouter(prefix="/api")
 async def root():
     return {"message": "Indian Heritage Cultural Website API", "status": "running"}
 
+@api_router.get("/health/live")
+async def liveness_check():
+    """The worker is up and serving; never touches the database"""
+    return {"status": "alive", "service": "Indian Heritage API"}
+
+@api_router.get("/health/ready")
+async def readiness_check_endpoint():
+    """503 unless MongoDB answers a ping; also reports pool saturation and cache warmth"""
+    result = await readiness_check.check()
+    status_code = 200 if result["status"] == "ready" else 503
+    return JSONResponse(
+        {**result, "service": "Indian Heritage API"},
+        status_code=status_code,
+        headers={"Cache-Control": "no-store"},
+    )
+
 @api_router.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "Indian Heritage API"}
+    """Alias of /health/ready for existing load balancer checks"""
+    return await readiness_check_endpoint()
+
+
+# Keeps this worker's caches in step with writes made through other workers
+cache_sync = CacheSync(
+    [
+        hero_slides_repository,
+        cultural_categories_repository,
+        regional_highlights_repository,
+        featured_stories_repository,
+    ],
+    mode=os.environ.get("CACHE_SYNC", "auto"),
+    poll_interval=float(os.environ.get("CACHE_POLL_INTERVAL_SECONDS", "5")),
+)
+
+
+# Homepage sections, each served from the same cache entry as its own endpoint:
+# name -> (repository, loader taking the selected fields)
+HOMEPAGE_SECTIONS = {
+    "hero_slides": (hero_slides_repository, hero_slides_repository.list_default),
+    "cultural_categories": (cultural_categories_repository, featured_cultural_categories),
+    "regional_highlights": (regional_highlights_repository, regional_highlights_repository.list_default),
+    "featured_stories": (featured_stories_repository, featured_stories_repository.list_default),
+}
+
+HOMEPAGE_FIELDS_DESCRIPTION = (
+    "Comma-separated section.field pairs, e.g. hero_slides.title,featured_stories.excerpt; "
+    "sections not named return their usual fields (id is always included)"
+)
+
+
+def homepage_fields(fields: Optional[str]) -> Dict[str, Optional[Tuple[str, ...]]]:
+    """Parse fields= into each section's selected fields (as its own endpoint would select them)"""
+    requested: Dict[str, List[str]] = {}
+    for item in (fields or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        section, _, field = item.partition(".")
+        if section not in HOMEPAGE_SECTIONS or not field:
+            raise HTTPException(status_code=400, detail=f"Invalid homepage field: {item} (expected section.field)")
+        requested.setdefault(section, []).append(field)
+
+    selected = {}
+    for name, (repository, _) in HOMEPAGE_SECTIONS.items():
+        section_fields = ",".join(requested[name]) if name in requested else None
+        selected[name] = select_fields(repository.model, section_fields, repository.list_exclude)
+    return selected
+
+
+# Keyed by section fields and ETags, so entries are replaced as soon as any section changes
+_homepage_cache = TTLCache("homepage", ttl=float(os.environ.get("CACHE_TTL_SECONDS", "300")), maxsize=16)
+
+
+@api_router.get("/homepage")
+async def get_homepage(
+    request: Request,
+    sections: Optional[str] = Query(
+        None,
+        description="Comma-separated list of sections to include (default: all). "
+                    "One of: " + ", ".join(HOMEPAGE_SECTIONS),
+    ),
+    fields: Optional[str] = Query(None, description=HOMEPAGE_FIELDS_DESCRIPTION),
+):
+    """Get every homepage section in a single round trip"""
+    if sections:
+        names = [name.strip() for name in sections.split(",") if name.strip()]
+        unknown = [name for name in names if name not in HOMEPAGE_SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown homepage sections: {', '.join(unknown)}")
+    else:
+        names = list(HOMEPAGE_SECTIONS)
+    selected = homepage_fields(fields)
+
+    try:
+        payloads = await asyncio.gather(*(HOMEPAGE_SECTIONS[name][1](selected[name]) for name in names))
+        # Reuse the combined payload (and its compressed variants) while no section changes
+        key = tuple(zip(names, (selected[name] for name in names), (payload.etag for payload in payloads)))
+        homepage = _homepage_cache.get(key)
+        if homepage is None:
+            # Splice the already-rendered section bodies instead of re-encoding them
+            body = b"{" + b",".join(b'"%s":%s' % (name.encode(), payload.body) for name, payload in zip(names, payloads)) + b"}"
+            last_modified = max((payload.last_modified for payload in payloads if payload.last_modified), default=None)
+            homepage = RenderedPayload(body, last_modified)
+            _homepage_cache.set(key, homepage)
+        return payload_response(request, homepage)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching homepage: {str(e)}")
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for every collection cache"""
+    return cache_stats()
+
+@api_router.get("/repositories/stats")
+async def get_repository_stats():
+    """Per-operation timings for every content repository"""
+    return repository_stats()
+
+@api_router.get("/cache/sync")
+async def get_cache_sync_stats():
+    """How this worker learns about writes made by other workers"""
+    return cache_sync.stats()
+
+@api_router.get("/db/pool")
+async def get_pool_stats():
+    """MongoDB connection pool statistics"""
+    return pool_stats()
+
+# Not registered with get_cache(), so it stays out of cache stats and readiness
+_stats_cache = TTLCache("stats", ttl=float(os.environ.get("STATS_CACHE_SECONDS", "10")), maxsize=1)
+
+@api_router.get("/stats")
+async def get_stats():
+    """Per-collection document counts, storage and index sizes, plus cache state"""
+    async def load():
+        return {"collections": await collection_stats(), "generated_at": datetime.utcnow()}
+
+    try:
+        # Collection stats are memoized; cache counters are cheap and always live
+        stats = await _stats_cache.get_or_load("collections", load)
+        return {**stats, "caches": cache_stats(), "status": "success"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
 
 # Include all route modules
 api_router.include_router(hero_slides_router)
@@ -51,6 +219,29 @@ api_router.include_router(newsletter_router)
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request and MongoDB command metrics in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# Write limits per client address. Routes not listed here get the default;
+# reads are never limited
+write_limit = int(os.environ.get("RATE_LIMIT_WRITES_PER_MINUTE", "60"))
+rate_limiter = RateLimiter(
+    default=RateLimit(write_limit, 60) if write_limit > 0 else None,
+    limits={
+        ("POST", "/api/newsletter/subscribe"): RateLimit(5, 60),
+        ("POST", "/api/newsletter/unsubscribe"): RateLimit(5, 60),
+        ("POST", "/api/newsletter/subscribe/bulk"): RateLimit(2, 60),
+        ("POST", "/api/newsletter/unsubscribe/bulk"): RateLimit(2, 60),
+    },
+    maxsize=int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "100000")),
+)
+register_collector(rate_limiter.render_metrics)
+if os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true":
+    # Added before CORS so 429 responses still carry CORS headers
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, router=app.router)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -60,6 +251,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    TracingMiddleware,
+    slow_request_ms=float(os.environ.get("SLOW_REQUEST_MS", "500")),
+    server_timing=os.environ.get("SERVER_TIMING", "false").lower() == "true",
+)
+
+# Cached payloads arrive already compressed (see rendering.payload_response)
+# and are passed through; this compresses everything else, e.g. exports
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
+# Outermost, so its latency covers CORS handling too
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -69,18 +273,50 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database with sample data"""
+    """Connect, check the database answers and warm the homepage caches.
+
+    Seeding and index creation live in seed.py so workers start fast.
+    """
+    started = time.perf_counter()
     logger.info("Starting Indian Heritage Cultural Website API...")
+    connect_to_database()
     try:
-        await init_database()
-        logger.info("Database initialized successfully")
+        await asyncio.wait_for(get_database().command("ping"), timeout=2)
+        default_fields = homepage_fields(None)
+        await asyncio.gather(*(load(default_fields[name]) for name, (_, load) in HOMEPAGE_SECTIONS.items()))
+        logger.info("Database reachable and caches warmed")
+        missing = await missing_unique_indexes()
+        if missing:
+            logger.error(
+                f"Unique indexes missing: {', '.join(missing)}. Run seed.py; until then concurrent "
+                f"writes can create duplicates (e.g. two subscribers with the same email)"
+            )
     except Exception as e:
-        logger.error(f"Error initializing database: {e}")
+        logger.error(f"Database not ready at startup: {e}")
+    cache_sync.start()
+    if NEWSLETTER_WRITE_BEHIND:
+        signup_queue.start()
+
+    if os.environ.get("VERIFY_QUERY_PLANS", "false").lower() == "true":
+        # Deliberately not caught: a route doing a COLLSCAN should stop the worker from starting
+        await verify_query_plans()
+        logger.info("Query plans verified: every route query is index-backed")
+
+    now = time.perf_counter()
+    app.state.startup_seconds = now - started
+    app.state.time_to_ready_seconds = now - PROCESS_STARTED
+    logger.info(
+        f"Worker ready in {app.state.time_to_ready_seconds:.3f}s "
+        f"(startup hook {app.state.startup_seconds:.3f}s)"
+    )
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close database connection"""
     logger.info("Shutting down API...")
+    await cache_sync.stop()
+    # Write queued newsletter signups before the connection goes away
+    await signup_queue.drain(timeout=float(os.environ.get("NEWSLETTER_DRAIN_TIMEOUT_SECONDS", "10")))
     try:
         await close_db_connection()
         logger.info("Database connection closed")
@@ -88,34 +324,6 @@ async def shutdown_event():
         logger.error(f"Error closing database connection: {e}")
 
 
-# Additional endpoints for testing
-@api_router.get("/test/all-data")
-async def get_all_test_data():
-    """Get all data for testing purposes"""
-    try:
-        from database import (
-            hero_slides_collection, 
-            cultural_categories_collection,
-            regional_highlights_collection,
-            featured_stories_collection
-        )
-        
-        hero_slides = await hero_slides_collection.find({}).to_list(None)
-        cultural_categories = await cultural_categories_collection.find({}).to_list(None)
-        regional_highlights = await regional_highlights_collection.find({}).to_list(None)
-        featured_stories = await featured_stories_collection.find({}).to_list(None)
-        
-        return {
-            "hero_slides": len(hero_slides),
-            "cultural_categories": len(cultural_categories),
-            "regional_highlights": len(regional_highlights),
-            "featured_stories": len(featured_stories),
-            "status": "success"
-        }
-    except Exception as e:
-        return {"error": str(e), "status": "error"}
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("server:app", host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
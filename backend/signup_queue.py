@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+import orjson
+
+from metrics import COMMAND_BUCKETS, Histogram, histogram_lines
+
+
+logger = logging.getLogger(__name__)
+
+
+class SignupQueue:
+    """Bounded write-behind queue for newsletter signups.
+
+    Requests only enqueue the email; one consumer task writes batches with
+    writer (one bulk_write of upserts per batch). submit() refuses new
+    emails when the queue is full or draining, so callers can shed load.
+    Signups that can't be written, including any a drain leaves behind on
+    timeout, are appended to failures_path (NDJSON, one email per line) for
+    replay; logs only ever carry counts.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[str]], Awaitable[dict]],
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        retries: int = 3,
+        failures_path: Optional[Path] = None,
+    ):
+        self.writer = writer
+        self.failures_path = failures_path
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.flush_latency = Histogram(COMMAND_BUCKETS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._in_flight: List[str] = []
+        self._draining = False
+
+    def start(self) -> None:
+        if self._consumer is not None:
+            return
+        # Created here so the queue belongs to the running event loop
+        self._queue = asyncio.Queue(self.maxsize)
+        self._draining = False
+        self._consumer = asyncio.create_task(self._consume())
+
+    @property
+    def running(self) -> bool:
+        return self._consumer is not None and not self._draining
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, email: str) -> bool:
+        """Queue email for the next batch; False if the queue is full or not accepting"""
+        if not self.running:
+            self.rejected += 1
+            return False
+        try:
+            self._queue.put_nowait(email)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.accepted += 1
+        return True
+
+    async def _next_batch(self, batch: List[str]) -> None:
+        batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _flush(self, batch: List[str]) -> None:
+        emails = list(dict.fromkeys(batch))
+        for attempt in range(1, self.retries + 1):
+            start = time.perf_counter()
+            try:
+                outcome = await self.writer(emails)
+            except Exception as e:
+                if attempt == self.retries:
+                    self.failed += len(emails)
+                    logger.error(f"{len(emails)} queued newsletter signups failed after {attempt} attempts: "
+                                 f"{type(e).__name__}")
+                    await self._dead_letter(emails, type(e).__name__)
+                    return
+                logger.warning(f"Newsletter signup flush failed (attempt {attempt}): {e}")
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                continue
+            self.flush_latency.observe(time.perf_counter() - start)
+            write_errors = outcome.get("writeErrors", [])
+            errors = len(write_errors)
+            if errors:
+                # errmsg and op quote the email, so only codes are logged
+                codes = sorted({error.get("code") for error in write_errors}, key=str)
+                logger.error(f"{errors} of {len(emails)} queued newsletter signups failed (codes {codes})")
+                await self._dead_letter(
+                    [emails[error["index"]] for error in write_errors], "write error"
+                )
+            self.failed += errors
+            self.written += len(emails) - errors
+            return
+
+    def _append_failures(self, emails: List[str], reason: str) -> None:
+        failed_at = datetime.utcnow()
+        lines = b"".join(
+            orjson.dumps({"email": email, "reason": reason, "failed_at": failed_at}) + b"\n" for email in emails
+        )
+        # Subscriber addresses: readable by the service user only
+        descriptor = os.open(self.failures_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        with os.fdopen(descriptor, "ab") as failures:
+            failures.write(lines)
+
+    async def _dead_letter(self, emails: List[str], reason: str) -> None:
+        if self.failures_path is None:
+            return
+        try:
+            await asyncio.to_thread(self._append_failures, emails, reason)
+        except OSError as e:
+            logger.error(f"Could not record {len(emails)} failed newsletter signups in {self.failures_path}: {e}")
+            return
+        self.dead_lettered += len(emails)
+        logger.info(f"Recorded {len(emails)} failed newsletter signups in {self.failures_path}")
+
+    async def _consume(self) -> None:
+        while True:
+            # Filled in place so a drain that times out can see what was taken
+            batch = self._in_flight = []
+            await self._next_batch(batch)
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _take_queued(self) -> List[str]:
+        emails = []
+        while True:
+            try:
+                emails.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return emails
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Stop accepting signups, write what is queued (up to timeout), then stop.
+
+        Whatever is still unwritten at the timeout (the batch in flight and
+        the rest of the queue) was already acknowledged with a 202, so it is
+        counted as failed and dead-lettered rather than dropped. The in-flight
+        batch may have been partly written; replaying it is a harmless upsert.
+        """
+        if self._consumer is None:
+            return
+        self._draining = True
+        unwritten: List[str] = []
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            unwritten = list(dict.fromkeys(self._in_flight + self._take_queued()))
+            self.failed += len(unwritten)
+            logger.error(f"Shutdown drain timed out with {len(unwritten)} newsletter signups unwritten")
+        self._consumer.cancel()
+        try:
+            await self._consumer
+        except asyncio.CancelledError:
+            pass
+        self._consumer = None
+        self._in_flight = []
+        if unwritten:
+            await self._dead_letter(unwritten, "shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "depth": self.depth(),
+            "max_depth": self.maxsize,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "dead_lettered": self.dead_lettered,
+            "flushes": self.flush_latency.count,
+        }
+
+    def render_metrics(self) -> List[str]:
+        lines = [
+            "# HELP newsletter_queue_depth Newsletter signups waiting to be written.",
+            "# TYPE newsletter_queue_depth gauge",
+            f"newsletter_queue_depth {self.depth()}",
+            "# HELP newsletter_queue_capacity Maximum queued newsletter signups.",
+            "# TYPE newsletter_queue_capacity gauge",
+            f"newsletter_queue_capacity {self.maxsize}",
+        ]
+        for name, value, help_text in (
+            ("accepted", self.accepted, "Signups queued."),
+            ("rejected", self.rejected, "Signups refused because the queue was full or draining."),
+            ("written", self.written, "Queued signups written to MongoDB."),
+            ("failed", self.failed, "Queued signups that could not be written."),
+            ("dead_lettered", self.dead_lettered, "Failed signups recorded in the failures file."),
+        ):
+            lines += [
+                f"# HELP newsletter_queue_{name}_total {help_text}",
+                f"# TYPE newsletter_queue_{name}_total counter",
+                f"newsletter_queue_{name}_total {value}",
+            ]
+        lines += [
+            "# HELP newsletter_queue_flush_duration_seconds Time to write one batch of queued signups.",
+            "# TYPE newsletter_queue_flush_duration_seconds histogram",
+        ]
+        return lines + histogram_lines("newsletter_queue_flush_duration_seconds", self.flush_latency, "")
@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from pymongo.monitoring import CommandListener
+
+
+logger = logging.getLogger(__name__)
+
+
+class Trace:
+    """Time spent per phase (db, model, serialize) during one request"""
+
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+class _Span:
+    __slots__ = ("name", "trace", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = _current_trace.get()
+        if self.trace is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.trace is not None:
+            self.trace.add(self.name, time.perf_counter() - self.start)
+        return False
+
+    # Usable alongside other async context managers in one async with
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        return self.__exit__(*exc_info)
+
+
+def span(name: str) -> _Span:
+    """Add the time spent in the with-block to the current request's trace.
+
+    Costs one context variable lookup when no request is being traced.
+    Motor runs commands on executor threads that don't inherit the
+    request's context, so wrap the await of a DB call rather than relying
+    on the command listener for per-request DB time.
+    """
+    return _Span(name)
+
+
+def _server_timing(trace: Trace, total: float) -> bytes:
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in trace.spans.items()]
+    entries.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(entries).encode()
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware that traces each request's phases.
+
+    Requests slower than SLOW_REQUEST_MS are logged with their breakdown;
+    with SERVER_TIMING=true every response carries a Server-Timing header.
+    """
+
+    def __init__(self, app, slow_request_ms: float = 500.0, server_timing: bool = False):
+        self.app = app
+        self.slow_request = slow_request_ms / 1000
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _current_trace.set(trace)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(trace, time.perf_counter() - start)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.slow_request:
+                route = scope.get("route")
+                breakdown = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in trace.spans.items())
+                logger.warning(
+                    f"Slow request {scope['method']} {route.path if route is not None else scope['path']} "
+                    f"{status} in {elapsed * 1000:.1f}ms ({breakdown or 'no traced phases'})"
+                )
+
+
+# Where each command keeps the part that decides which documents it touches
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "explain": "explain",
+}
+
+
+def _shape(value, depth: int = 0):
+    """value with every literal replaced by "?", keeping keys and operators"""
+    if isinstance(value, dict):
+        if depth > 4:
+            return "{...}"
+        return {key: _shape(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            # $or/$and branches and pipeline stages; the first few show the shape
+            return [_shape(item, depth + 1) for item in value[:3]] + ([f"+{len(value) - 3}"] if len(value) > 3 else [])
+        return f"[{len(value)}]"
+    return "?"
+
+
+def _command_shape(command_name: str, command: dict) -> str:
+    """Collection and filter keys of a command, without values (emails, ids)"""
+    target = command.get(command_name)
+    collection = target if isinstance(target, str) else command.get("collection", "")
+    if command_name in ("update", "delete"):
+        statements = command.get(f"{command_name}s", [])
+        first = _shape(statements[0].get("q", {})) if statements else {}
+        return f"{collection} {len(statements)} statement(s), first filter {first}"
+    if command_name == "insert":
+        return f"{collection} {len(command.get('documents', []))} document(s)"
+    field = _FILTER_FIELDS.get(command_name)
+    if field and field in command:
+        return f"{collection} {field} {_shape(command[field])}"
+    return collection
+
+
+class SlowCommandLogger(CommandListener):
+    """Log MongoDB commands slower than threshold_ms, with their shape (never their values)"""
+
+    def __init__(self, threshold_ms: float = 100.0):
+        self.threshold_micros = threshold_ms * 1000
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[object, int], Tuple[str, dict]] = {}
+
+    def started(self, event):
+        with self._lock:
+            self._in_flight[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def _finished(self, event, outcome: str) -> None:
+        with self._lock:
+            database_name, command = self._in_flight.pop((event.connection_id, event.request_id), ("", None))
+        if event.duration_micros >= self.threshold_micros:
+            shape = _command_shape(event.command_name, command) if command is not None else ""
+            logger.warning(
+                f"Slow MongoDB command {event.command_name} on {database_name} "
+                f"{outcome} in {event.duration_micros / 1000:.1f}ms: {shape}"
+            )
+
+    def succeeded(self, event):
+        self._finished(event, "succeeded")
+
+    def failed(self, event):
+        self._finished(event, "failed")
@@ -36,6 +36,9 @@ apiClient.interceptors.response.use(
 );
 
 export const apiService = {
+  // Homepage (all sections in one request)
+  getHomepage: (sections) => apiClient.get('/homepage', { params: sections ? { sections: sections.join(',') } : {} }),
+  
   // Hero slides
   getHeroSlides: () => apiClient.get('/hero-slides'),
   getHeroSlide: (id) => apiClient.get(`/hero-slides/${id}`),
@@ -60,8 +63,9 @@ export const apiService = {
   
   // Featured stories
   getFeaturedStories: () => apiClient.get('/featured-stories'),
-  getAllStories: () => apiClient.get('/featured-stories/all'),
-  getStoriesByCategory: (category) => apiClient.get(`/featured-stories/category/${category}`),
+  getAllStories: (params) => apiClient.get('/featured-stories/all', { params }),
+  getStoriesByCategory: (category, params) => apiClient.get(`/featured-stories/category/${category}`, { params }),
+  searchStories: (q, params) => apiClient.get('/featured-stories/search', { params: { q, ...params } }),
   getStory: (id) => apiClient.get(`/featured-stories/${id}`),
   createStory: (data) => apiClient.post('/featured-stories', data),
   updateStory: (id, data) => apiClient.put(`/featured-stories/${id}`, data),
@@ -70,12 +74,14 @@ export const apiService = {
   // Newsletter
   subscribeNewsletter: (email) => apiClient.post('/newsletter/subscribe', { email }),
   unsubscribeNewsletter: (email) => apiClient.post('/newsletter/unsubscribe', { email }),
-  getNewsletterSubscribers: () => apiClient.get('/newsletter/subscribers'),
+  getNewsletterSubscribers: (params) => apiClient.get('/newsletter/subscribers', { params }),
   getSubscriberCount: () => apiClient.get('/newsletter/subscribers/count'),
   
-  // Health and testing
+  // Health and stats
   healthCheck: () => apiClient.get('/health'),
-  getAllTestData: () => apiClient.get('/test/all-data'),
+  livenessCheck: () => apiClient.get('/health/live'),
+  readinessCheck: () => apiClient.get('/health/ready'),
+  getStats: () => apiClient.get('/stats'),
 };
 
 // Error handler helper
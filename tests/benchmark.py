@@ -0,0 +1,357 @@
+# API load test and latency benchmark.
+#
+# Starts the app in-process (httpx over ASGI, no network), seeds realistic
+# volumes and measures p50/p95/p99 latency and throughput for the list,
+# get-by-id, batch, create, update and subscribe routes of every router.
+#
+#   python tests/benchmark.py                                  # in-memory (mongomock-motor)
+#   python tests/benchmark.py --mongo-url mongodb://localhost:27017
+#   python tests/benchmark.py --output new.json --baseline old.json --max-regression 0.2
+#
+# Against a real MongoDB the defaults are 10k stories and 1M subscribers, in
+# the database named by --db-name (dropped and re-seeded unless --skip-seed).
+# mongomock scans every document on each query and checks unique indexes
+# linearly, so in-memory runs default to smaller volumes and skip the
+# $text search route. Set CACHE_TTL_SECONDS=0 to measure uncached reads: it
+# turns off the repository, search and homepage caches, stale copies included.
+# With --baseline, exits 1 if any route's p95 regressed by more than
+# --max-regression (and by at least --min-delta-ms).
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+CATEGORIES = [
+    "Classical Arts", "Festivals", "Folk Music", "Textiles", "Cuisine", "Architecture",
+    "Temples", "Dance", "Literature", "Handicrafts", "Rituals", "Local Food",
+]
+REGIONS = ["North India", "South India", "East India", "West India", "Northeast India", "Central India"]
+WORDS = (
+    "heritage tradition river temple monsoon festival loom spice rhythm raga village "
+    "harvest courtyard lamp pilgrimage dynasty fresco weaver market melody".split()
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Indian Heritage API")
+    parser.add_argument("--mongo-url", help="Benchmark against this MongoDB instead of mongomock-motor")
+    parser.add_argument("--db-name", default="heritage_benchmark")
+    parser.add_argument("--stories", type=int, help="Stories to seed (default 10000; 2000 in memory)")
+    parser.add_argument("--subscribers", type=int, help="Subscribers to seed (default 1000000; 20000 in memory)")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the data already in --db-name")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per route")
+    parser.add_argument("--only", help="Comma-separated route names to run")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and request mix")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 increase, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p95 increases smaller than this")
+    return parser.parse_args()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def hero_slide_body(rng: random.Random) -> dict:
+    return {
+        "title": sentence(rng, 3),
+        "description": sentence(rng, 12),
+        "categories": rng.sample(CATEGORIES, 3),
+        "bg_color": "bg-orange-100",
+        "text_color": "text-orange-900",
+        "image_url": "https://example.com/slide.jpg",
+        "region": rng.choice(REGIONS),
+        "sort_order": rng.randint(0, 100),
+    }
+
+
+def cultural_category_body(rng: random.Random) -> dict:
+    return {
+        "title": rng.choice(CATEGORIES),
+        "description": sentence(rng, 12),
+        "bg_color": "bg-amber-100",
+        "text_color": "text-amber-900",
+        "categories": rng.sample(CATEGORIES, 3),
+        "count_text": f"{rng.randint(10, 500)}+ Stories",
+        "image_url": "https://example.com/category.jpg",
+        "is_featured": rng.random() < 0.5,
+        "sort_order": rng.randint(0, 100),
+    }
+
+
+def regional_highlight_body(rng: random.Random) -> dict:
+    return {
+        "region_name": rng.choice(REGIONS),
+        "states": [sentence(rng, 1) for _ in range(4)],
+        "cultural_highlights": [sentence(rng, 2) for _ in range(4)],
+        "bg_color": "bg-green-100",
+        "text_color": "text-green-900",
+        "sort_order": rng.randint(0, 100),
+    }
+
+
+def story_body(rng: random.Random) -> dict:
+    return {
+        "title": sentence(rng, 6),
+        "excerpt": sentence(rng, 25),
+        # ~2KB, roughly a real story body
+        "content": " ".join(sentence(rng, 12) + "." for _ in range(25)),
+        "category": rng.choice(CATEGORIES),
+        "read_time": f"{rng.randint(3, 15)} min read",
+        "image_url": "https://example.com/story.jpg",
+        "author": sentence(rng, 2),
+        "is_featured": rng.random() < 0.05,
+    }
+
+
+async def seed(stories: int, subscribers: int, rng: random.Random, in_memory: bool) -> None:
+    import database
+    import seed as sample_data
+    from models import FeaturedStory, NewsletterSubscriber, normalize_category
+
+    database_handle = database.get_database()
+    for name in await database_handle.list_collection_names():
+        await database_handle.drop_collection(name)
+    if not in_memory:
+        await database.ensure_indexes()
+    await sample_data.seed_database()
+
+    now = datetime.utcnow()
+    batch = []
+    for i in range(stories):
+        story = FeaturedStory(
+            **story_body(rng), published_at=now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60))
+        ).dict()
+        story["category_key"] = normalize_category(story["category"])
+        batch.append(story)
+        if len(batch) == 5000 or i == stories - 1:
+            await database.featured_stories_collection.insert_many(batch, ordered=False)
+            batch = []
+
+    for i in range(subscribers):
+        batch.append(NewsletterSubscriber(
+            email=f"reader{i}@example.com", is_active=rng.random() < 0.9,
+            subscribed_at=now - timedelta(seconds=i),
+        ).dict())
+        if len(batch) == 10000 or i == subscribers - 1:
+            await database.newsletter_subscribers_collection.insert_many(batch, ordered=False)
+            batch = []
+    logging.info(f"Seeded {stories} stories and {subscribers} subscribers")
+
+
+class Route:
+    """One benchmarked request shape; path/body are built per request"""
+
+    def __init__(self, name: str, method: str, path: Callable[[], str], body: Optional[Callable[[], dict]] = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+
+
+def build_routes(ids: Dict[str, List[str]], rng: random.Random, in_memory: bool) -> List[Route]:
+    routes = []
+    content = [
+        ("hero_slides", "/api/hero-slides", hero_slide_body),
+        ("cultural_categories", "/api/cultural-categories", cultural_category_body),
+        ("regional_highlights", "/api/regional-highlights", regional_highlight_body),
+        ("featured_stories", "/api/featured-stories", story_body),
+    ]
+    for name, prefix, body in content:
+        # Bind loop variables now; the lambdas run later
+        def pick(name=name):
+            return rng.choice(ids[name])
+
+        routes += [
+            Route(f"{name}.list", "GET", lambda prefix=prefix: f"{prefix}/"),
+            Route(f"{name}.get", "GET", lambda prefix=prefix, pick=pick: f"{prefix}/{pick()}"),
+            Route(f"{name}.batch", "GET",
+                  lambda prefix=prefix, name=name: f"{prefix}/batch?ids={','.join(rng.sample(ids[name], min(10, len(ids[name]))))}"),
+            Route(f"{name}.create", "POST", lambda prefix=prefix: f"{prefix}/", lambda body=body: body(rng)),
+            Route(f"{name}.update", "PUT", lambda prefix=prefix, pick=pick: f"{prefix}/{pick()}", lambda body=body: body(rng)),
+        ]
+
+    routes += [
+        Route("cultural_categories.featured", "GET", lambda: "/api/cultural-categories/featured"),
+        Route("featured_stories.all", "GET", lambda: "/api/featured-stories/all?limit=20"),
+        Route("featured_stories.category", "GET",
+              lambda: f"/api/featured-stories/category/{rng.choice(CATEGORIES)}?limit=20"),
+        Route("newsletter.subscribe", "POST", lambda: "/api/newsletter/subscribe",
+              lambda: {"email": f"new{rng.randrange(10 ** 9)}@example.com"}),
+        Route("newsletter.resubscribe", "POST", lambda: "/api/newsletter/subscribe",
+              lambda: {"email": f"reader{rng.randrange(max(1, ids['subscriber_count']))}@example.com"}),
+        Route("newsletter.subscribers", "GET", lambda: "/api/newsletter/subscribers?limit=50"),
+        Route("newsletter.count", "GET", lambda: "/api/newsletter/subscribers/count"),
+        Route("homepage", "GET", lambda: "/api/homepage"),
+        Route("health.ready", "GET", lambda: "/api/health/ready"),
+    ]
+    if not in_memory:
+        # mongomock has no $text support
+        routes.append(Route("featured_stories.search", "GET",
+                            lambda: f"/api/featured-stories/search?q={rng.choice(WORDS)}"))
+    return routes
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_route(client, route: Route, requests: int, concurrency: int, warmup: int) -> dict:
+    async def send():
+        return await client.request(route.method, route.path(), json=route.body() if route.body else None)
+
+    for _ in range(warmup):
+        await send()
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await send()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": route.method,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], max_regression: float, min_delta_ms: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        limit = previous["p95_ms"] * (1 + max_regression)
+        if result["p95_ms"] > limit and result["p95_ms"] - previous["p95_ms"] >= min_delta_ms:
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms "
+                f"(+{(result['p95_ms'] / previous['p95_ms'] - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+async def main() -> int:
+    args = parse_args()
+    in_memory = not args.mongo_url
+    stories = args.stories if args.stories is not None else (2000 if in_memory else 10000)
+    subscribers = args.subscribers if args.subscribers is not None else (20000 if in_memory else 1000000)
+
+    # Before the app is imported, so its load_dotenv() keeps these
+    os.environ["DB_NAME"] = args.db_name
+    # Every benchmark request comes from one client address
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    else:
+        # mongomock has no change streams and there is only one process to keep in step
+        os.environ["CACHE_SYNC"] = "off"
+
+    import httpx
+    import database
+    import server
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if in_memory:
+        from mongomock_motor import AsyncMongoMockClient
+        database.connect_to_database(AsyncMongoMockClient())
+    else:
+        database.connect_to_database()
+
+    rng = random.Random(args.seed)
+    if not args.skip_seed:
+        await seed(stories, subscribers, rng, in_memory)
+
+    ids = {
+        name: [document["id"] async for document in getattr(database, f"{name}_collection").find({}, {"id": 1}).limit(1000)]
+        for name in ("hero_slides", "cultural_categories", "regional_highlights", "featured_stories")
+    }
+    ids["subscriber_count"] = await database.newsletter_subscribers_collection.estimated_document_count()
+
+    routes = build_routes(ids, rng, in_memory)
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(",")}
+        routes = [route for route in routes if route.name in wanted]
+
+    for handler in server.app.router.on_startup:
+        await handler()
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        for route in routes:
+            results[route.name] = await run_route(client, route, args.requests, args.concurrency, args.warmup)
+            result = results[route.name]
+            print(
+                f"{route.name:32} p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+                f"p99 {result['p99_ms']:8.2f}ms  {result['throughput_rps']:8.1f} req/s  errors {result['errors']}"
+            )
+
+    for handler in server.app.router.on_shutdown:
+        await handler()
+
+    report = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "backend": "mongodb" if args.mongo_url else "mongomock-motor",
+            "stories": stories,
+            "subscribers": subscribers,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "cache_ttl_seconds": os.environ.get("CACHE_TTL_SECONDS"),
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(results, baseline, args.max_regression, args.min_delta_ms)
+        if regressions:
+            print("Regressions against " + args.baseline + ":")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"No p95 regressions over {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,36 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+# Before the app is imported, so its load_dotenv() keeps these
+os.environ["DB_NAME"] = "heritage_tests"
+os.environ["CACHE_SYNC"] = "off"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["NEWSLETTER_WRITE_BEHIND"] = "false"
+
+
+@pytest.fixture
+def client():
+    """The app over an empty in-memory database (mongomock-motor) seeded with the sample content"""
+    from fastapi.testclient import TestClient
+    from mongomock_motor import AsyncMongoMockClient
+
+    import database
+    import seed
+    import server
+    from crud import _repositories
+
+    database.connect_to_database(AsyncMongoMockClient())
+    asyncio.run(seed.seed_database())
+    # Caches are per process; drop whatever an earlier test left behind
+    for repository in _repositories.values():
+        repository.mark_written()
+    with TestClient(server.app) as test_client:
+        yield test_client
+    asyncio.run(database.close_db_connection())
@@ -0,0 +1,124 @@
+import asyncio
+
+from cache import TTLCache
+
+
+class Loader:
+    """Counts calls; each load waits for release() and returns its call number"""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = asyncio.Event()
+
+    def release(self):
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await self.gate.wait()
+        return f"value {call}"
+
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        cache = TTLCache("test")
+        loader = Loader()
+        waiters = [asyncio.create_task(cache.get_or_load("key", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release()
+        return cache, loader, await asyncio.gather(*waiters)
+
+    cache, loader, results = asyncio.run(run())
+    assert loader.calls == 1
+    assert results == ["value 1"] * 5
+    assert cache.coalesced == 4
+    assert cache.get("key") == "value 1"
+
+
+def test_load_in_flight_during_invalidate_is_not_cached():
+    async def run():
+        cache = TTLCache("test")
+        loader = Loader()
+        waiter = asyncio.create_task(cache.get_or_load("key", loader))
+        while not loader.calls:
+            await asyncio.sleep(0)
+        cache.invalidate()
+        loader.release()
+        first = await waiter
+        cached = cache.get("key")
+        # The next miss starts its own load rather than joining the old one
+        second = await cache.get_or_load("key", loader)
+        return first, cached, second, loader.calls
+
+    first, cached, second, calls = asyncio.run(run())
+    assert first == "value 1"
+    assert cached is None
+    assert second == "value 2"
+    assert calls == 2
+
+
+def test_load_created_before_invalidate_is_not_cached():
+    async def run():
+        cache = TTLCache("test")
+        loader = Loader()
+        loader.release()
+        waiter = asyncio.create_task(cache.get_or_load("key", loader))
+        # The shared load task exists but hasn't run yet
+        await asyncio.sleep(0)
+        cache.invalidate()
+        return await waiter, cache.get("key")
+
+    assert asyncio.run(run()) == ("value 1", None)
+
+
+def test_expired_entry_is_served_stale_while_one_refresh_runs():
+    async def run():
+        cache = TTLCache("test", ttl=0.01, stale_ttl=60)
+        cache.set("key", "old")
+        await asyncio.sleep(0.02)
+
+        loader = Loader()
+        stale = [await cache.get_or_load("key", loader) for _ in range(3)]
+        refresh = cache._loading["key"]
+        await asyncio.sleep(0)
+        calls_while_stale = loader.calls
+        loader.release()
+        await refresh
+        return stale, calls_while_stale, cache.get("key"), cache
+
+    stale, calls_while_stale, refreshed, cache = asyncio.run(run())
+    assert stale == ["old"] * 3
+    assert calls_while_stale == 1
+    assert cache.stale_hits == 3
+    assert refreshed == "value 1"
+
+
+def test_entry_past_stale_ttl_is_a_miss():
+    async def run():
+        cache = TTLCache("test", ttl=0.01, stale_ttl=0.01)
+        cache.set("key", "old")
+        await asyncio.sleep(0.03)
+        loader = Loader()
+        loader.release()
+        return await cache.get_or_load("key", loader), cache
+
+    value, cache = asyncio.run(run())
+    assert value == "value 1"
+    assert cache.stale_hits == 0
+    assert cache.expirations == 1
+
+
+def test_zero_ttl_disables_caching_even_with_stale_ttl():
+    async def run():
+        cache = TTLCache("test", ttl=0, stale_ttl=300)
+        loader = Loader()
+        loader.release()
+        values = [await cache.get_or_load("key", loader) for _ in range(3)]
+        cache.set("key", "ignored")
+        return values, cache
+
+    values, cache = asyncio.run(run())
+    assert values == ["value 1", "value 2", "value 3"]
+    assert cache.stats()["entries"] == 0
+    assert cache.stale_hits == 0
@@ -0,0 +1,37 @@
+import time
+
+
+def test_list_last_modified_moves_when_a_row_leaves_the_list(client):
+    first = client.get("/api/hero-slides/")
+    assert first.status_code == 200
+    assert len(first.json()) == 5
+    last_modified = first.headers["Last-Modified"]
+
+    # Last-Modified has one-second resolution
+    time.sleep(1.1)
+    slide = client.get("/api/hero-slides/1").json()
+    slide.pop("id")
+    slide.pop("created_at", None)
+    slide.pop("updated_at", None)
+    updated = client.put("/api/hero-slides/1", json={**slide, "is_active": False})
+    assert updated.status_code == 200
+
+    second = client.get("/api/hero-slides/")
+    assert len(second.json()) == 4
+    assert second.headers["Last-Modified"] != last_modified
+
+    revalidated = client.get("/api/hero-slides/", headers={"If-Modified-Since": last_modified})
+    assert revalidated.status_code == 200
+    assert len(revalidated.json()) == 4
+
+
+def test_list_etag_revalidation(client):
+    first = client.get("/api/hero-slides/")
+    etag = first.headers["ETag"]
+
+    assert client.get("/api/hero-slides/", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.delete("/api/hero-slides/2").status_code == 200
+    after_delete = client.get("/api/hero-slides/", headers={"If-None-Match": etag})
+    assert after_delete.status_code == 200
+    assert after_delete.headers["ETag"] != etag
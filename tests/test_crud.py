@@ -0,0 +1,38 @@
+from routes.featured_stories import featured_stories_repository
+
+
+def test_batch_and_by_id_reads_do_not_touch_the_listing_cache(client):
+    assert client.get("/api/featured-stories/").status_code == 200
+    listings = dict(featured_stories_repository.cache._entries)
+
+    for i in range(300):
+        assert client.get("/api/featured-stories/batch", params={"ids": f"1,2,missing-{i}"}).status_code == 200
+    assert client.get("/api/featured-stories/1").status_code == 200
+
+    assert dict(featured_stories_repository.cache._entries) == listings
+    assert len(featured_stories_repository.item_cache._entries) == 301
+
+
+def test_writes_invalidate_item_payloads(client):
+    story = client.get("/api/featured-stories/1").json()
+    update = {key: story[key] for key in ("excerpt", "content", "category", "read_time", "image_url", "author")}
+    assert client.put("/api/featured-stories/1", json={**update, "title": "Renamed"}).status_code == 200
+
+    assert client.get("/api/featured-stories/1").json()["title"] == "Renamed"
+    assert client.get("/api/featured-stories/batch", params={"ids": "1"}).json()[0]["title"] == "Renamed"
+
+
+def test_cached_reads_use_the_primary(client, monkeypatch):
+    import database
+    from mongomock_motor import AsyncMongoMockClient
+
+    # A secondary that hasn't replicated anything yet
+    monkeypatch.setattr(database, "_read_db", AsyncMongoMockClient()["lagging"])
+    assert client.put("/api/hero-slides/1", json={
+        key: value for key, value in client.get("/api/hero-slides/1").json().items()
+        if key not in ("id", "created_at", "updated_at")
+    } | {"title": "Fresh title"}).status_code == 200
+
+    assert client.get("/api/hero-slides/").json()[0]["title"] == "Fresh title"
+    assert client.get("/api/hero-slides/1").json()["title"] == "Fresh title"
+    assert len(client.get("/api/featured-stories/all").json()["data"]) == 3
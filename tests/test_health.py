@@ -0,0 +1,10 @@
+import health
+
+
+def test_unbounded_pool_reports_no_saturation(monkeypatch):
+    # MONGO_MAX_POOL_SIZE=0 is pymongo's "no limit"
+    monkeypatch.setattr(health, "pool_stats", lambda: {"checked_out": 3, "max_pool_size": 0, "waiting": 0})
+    assert health.ReadinessCheck._pool()["saturation"] is None
+
+    monkeypatch.setattr(health, "pool_stats", lambda: {"checked_out": 3, "max_pool_size": 12, "waiting": 0})
+    assert health.ReadinessCheck._pool()["saturation"] == 0.25
@@ -0,0 +1,27 @@
+def test_homepage_returns_every_section(client):
+    body = client.get("/api/homepage").json()
+    assert set(body) == {"hero_slides", "cultural_categories", "regional_highlights", "featured_stories"}
+    assert "content" not in body["featured_stories"][0]
+
+
+def test_homepage_fields_select_per_section(client):
+    response = client.get(
+        "/api/homepage",
+        params={"sections": "hero_slides,featured_stories", "fields": "hero_slides.title,featured_stories.excerpt"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"hero_slides", "featured_stories"}
+    assert all(set(slide) == {"id", "title"} for slide in body["hero_slides"])
+    assert all(set(story) == {"id", "excerpt"} for story in body["featured_stories"])
+
+    # A different selection is a different cached payload
+    full = client.get("/api/homepage", params={"sections": "hero_slides,featured_stories"})
+    assert full.headers["ETag"] != response.headers["ETag"]
+    assert "description" in full.json()["hero_slides"][0]
+
+
+def test_homepage_rejects_unknown_fields(client):
+    assert client.get("/api/homepage", params={"fields": "hero_slides.nope"}).status_code == 400
+    assert client.get("/api/homepage", params={"fields": "nope.title"}).status_code == 400
+    assert client.get("/api/homepage", params={"fields": "title"}).status_code == 400
@@ -0,0 +1,10 @@
+def test_unknown_methods_share_one_label(client):
+    for method in ("FOO", "BAR", "PURGE"):
+        client.request(method, "/api/hero-slides/")
+    client.get("/api/hero-slides/")
+
+    body = client.get("/metrics").text
+    assert 'method="OTHER",route="/api/hero-slides/"' in body
+    assert 'method="GET",route="/api/hero-slides/"' in body
+    for method in ("FOO", "BAR", "PURGE"):
+        assert f'method="{method}"' not in body
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime
+
+import orjson
+
+import database
+
+
+def insert_subscribers(documents):
+    asyncio.run(database.newsletter_subscribers_collection.insert_many(documents))
+
+
+def test_export_resumes_after_cursor_without_repeats(client):
+    # A bulk import: every row shares one timestamp
+    imported_at = datetime(2024, 3, 1, 9, 30)
+    insert_subscribers([
+        {"id": f"{i:03d}", "email": f"reader{i}@example.com", "is_active": True, "subscribed_at": imported_at}
+        for i in range(50)
+    ])
+
+    full = [orjson.loads(line) for line in client.get("/api/newsletter/subscribers/export").content.splitlines()]
+    ids = [row["id"] for row in full]
+    assert len(ids) == len(set(ids)) == 50
+
+    # Interrupted after 20 rows
+    resumed = client.get("/api/newsletter/subscribers/export", params={"after": full[19]["cursor"]})
+    rest = [orjson.loads(line)["id"] for line in resumed.content.splitlines()]
+    assert ids[:20] + rest == ids
+
+
+def test_export_csv_carries_cursor_column(client):
+    insert_subscribers([
+        {"id": "a", "email": "a@example.com", "is_active": True, "subscribed_at": datetime(2024, 1, 1)},
+        {"id": "b", "email": "b@example.com", "is_active": True, "subscribed_at": datetime(2024, 1, 2)},
+    ])
+    lines = client.get("/api/newsletter/subscribers/export", params={"format": "csv"}).text.splitlines()
+    assert lines[0] == "id,email,is_active,subscribed_at,cursor"
+    cursor = lines[1].rsplit(",", 1)[1]
+
+    resumed = client.get("/api/newsletter/subscribers/export", params={"format": "csv", "after": cursor})
+    assert [line.split(",")[0] for line in resumed.text.splitlines()[1:]] == ["b"]
+
+
+def test_export_rejects_bad_cursor(client):
+    assert client.get("/api/newsletter/subscribers/export", params={"after": "garbage"}).status_code == 400
+
+
+def subscribe(client, email):
+    response = client.post("/api/newsletter/subscribe", json={"email": email})
+    assert response.status_code == 200
+    return response.json()["message"]
+
+
+def test_subscribe_new_existing_and_reactivated(client):
+    assert subscribe(client, "Reader@Example.com") == "Successfully subscribed to newsletter"
+    assert subscribe(client, "reader@example.com") == "Email already subscribed to newsletter"
+
+    client.post("/api/newsletter/unsubscribe", json={"email": "reader@example.com"})
+    assert subscribe(client, "reader@example.com") == "Newsletter subscription reactivated successfully"
+
+    count = asyncio.run(database.newsletter_subscribers_collection.count_documents({"email": "reader@example.com"}))
+    assert count == 1
+
+
+def test_subscribe_retries_after_losing_the_insert_race(client, monkeypatch):
+    from pymongo.errors import DuplicateKeyError
+
+    collection = database.newsletter_subscribers_collection
+    real_update = collection.find_one_and_update
+    calls = []
+
+    async def racing_update(query, update, **kwargs):
+        calls.append(kwargs.get("upsert", False))
+        if kwargs.get("upsert"):
+            # Another request inserted the (inactive) subscriber first
+            await collection.insert_one({"id": "other", "email": query["email"], "is_active": False})
+            raise DuplicateKeyError("E11000 duplicate key error")
+        return await real_update(query, update, **kwargs)
+
+    monkeypatch.setattr(collection, "find_one_and_update", racing_update, raising=False)
+    assert subscribe(client, "racer@example.com") == "Newsletter subscription reactivated successfully"
+    assert calls == [True, False]
+    document = asyncio.run(collection.find_one({"email": "racer@example.com"}))
+    assert document["is_active"] is True
+
+
+def test_bulk_subscribe_maps_results_by_upserted_index(client, monkeypatch):
+    from routes import newsletter
+
+    seen = []
+
+    async def bulk_result(emails):
+        # What MongoDB returns for [new, existing-active, existing-inactive, failing]
+        seen.append(emails)
+        return {
+            "upserted": [{"index": 0, "_id": "x"}],
+            "nMatched": 2,
+            "nModified": 1,
+            "writeErrors": [{"index": 3, "code": 11000, "errmsg": "duplicate key"}],
+        }
+
+    monkeypatch.setattr(newsletter, "bulk_upsert_subscribers", bulk_result)
+    response = client.post("/api/newsletter/subscribe/bulk", json={"emails": [
+        "new@example.com", "not-an-email", "Active@example.com", "inactive@example.com",
+        "new@example.com", "broken@example.com",
+    ]})
+    data = response.json()["data"]
+
+    assert seen == [["new@example.com", "active@example.com", "inactive@example.com", "broken@example.com"]]
+    assert [(item["email"], item["status"]) for item in data["results"]] == [
+        ("new@example.com", "subscribed"),
+        ("not-an-email", "invalid"),
+        ("active@example.com", "existing"),
+        ("inactive@example.com", "existing"),
+        ("new@example.com", "duplicate"),
+        ("broken@example.com", "error"),
+    ]
+    assert data["summary"] == {
+        "received": 6, "invalid": 1, "duplicates": 1, "subscribed": 1,
+        "reactivated": 1, "already_subscribed": 1, "errors": 1,
+    }
+    assert response.json()["success"] is False
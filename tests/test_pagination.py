@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+import orjson
+
+import pytest
+from fastapi import HTTPException
+from mongomock_motor import AsyncMongoMockClient
+from pydantic import BaseModel
+
+from pagination import decode_cursor, encode_cursor, keyset_query, paginate
+
+
+class Story(BaseModel):
+    id: str
+    published_at: Optional[datetime] = None
+
+
+def test_cursor_round_trips():
+    published = datetime(2024, 5, 1, 12, 30, 15, 123000)
+    assert decode_cursor(encode_cursor(published, "42")) == (published, "42")
+    assert decode_cursor(encode_cursor(None, "42")) == (None, "42")
+
+
+def test_invalid_cursor_is_a_400():
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor("not-a-cursor")
+    assert raised.value.status_code == 400
+
+
+def test_keyset_query_after_null_timestamp_pages_by_id():
+    cursor = encode_cursor(None, "7")
+    assert keyset_query({}, "published_at", cursor) == {"published_at": None, "id": {"$lt": "7"}}
+    assert keyset_query({"category_key": "dance"}, "published_at", cursor) == {
+        "$and": [{"category_key": "dance"}, {"published_at": None, "id": {"$lt": "7"}}]
+    }
+    assert keyset_query({"category_key": "dance"}, "published_at", None) == {"category_key": "dance"}
+
+
+def test_paging_visits_every_document_once_including_null_timestamps():
+    documents = [
+        {"id": f"{i:02d}", "published_at": datetime(2024, 1, 1 + i % 3) if i % 4 else None}
+        for i in range(10)
+    ]
+
+    async def run():
+        collection = AsyncMongoMockClient()["pagination"]["stories"]
+        await collection.insert_many([dict(document) for document in documents])
+        seen, cursor = [], None
+        while True:
+            page = await paginate(collection, {}, "published_at", Story, 3, cursor, {"_id": 0})
+            body = orjson.loads(page.body)
+            seen += [item["id"] for item in body["data"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(run())
+    assert sorted(seen) == sorted(document["id"] for document in documents)
+    # Newest first, then the documents without a timestamp
+    dated = [document for document in documents if document["published_at"]]
+    expected = sorted(dated, key=lambda d: (d["published_at"], d["id"]), reverse=True)
+    assert seen[:len(dated)] == [document["id"] for document in expected]
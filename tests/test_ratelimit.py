@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from ratelimit import GCRATable, RateLimit, RateLimiter, RateLimitMiddleware
+
+
+def test_gcra_allows_burst_then_reports_wait():
+    table = GCRATable()
+    limit = RateLimit(5, 60)
+
+    assert [table.acquire("client", limit, 100.0) for _ in range(5)] == [0.0] * 5
+    # One request is paid back every 60 / 5 = 12 seconds
+    assert table.acquire("client", limit, 100.0) == 12.0
+    assert table.acquire("client", limit, 106.0) == 6.0
+    assert table.acquire("client", limit, 112.0) == 0.0
+    assert table.acquire("client", limit, 112.0) > 0
+    # Other keys have their own allowance
+    assert table.acquire("other", limit, 112.0) == 0.0
+
+
+def test_gcra_table_evicts_least_recently_seen():
+    table = GCRATable(maxsize=2)
+    limit = RateLimit(1, 60)
+    for key in ("a", "b", "c"):
+        table.acquire(key, limit, 0.0)
+    assert len(table) == 2
+    assert table.evictions == 1
+    # "a" was evicted, so it starts with a full allowance again
+    assert table.acquire("a", limit, 0.0) == 0.0
+
+
+def test_middleware_answers_429_with_retry_after():
+    app = FastAPI()
+
+    @app.post("/things/{thing_id}")
+    async def write(thing_id: str):
+        return {"id": thing_id}
+
+    @app.get("/things/{thing_id}")
+    async def read(thing_id: str):
+        return {"id": thing_id}
+
+    limiter = RateLimiter(default=RateLimit(3, 60))
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, router=app.router)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Different ids share the route template's allowance
+            writes = [await client.post(f"/things/{i}") for i in range(4)]
+            read_response = await client.get("/things/1")
+        return writes, read_response
+
+    writes, read_response = asyncio.run(run())
+    assert [response.status_code for response in writes] == [200, 200, 200, 429]
+    assert writes[3].headers["Retry-After"] == "20"
+    assert read_response.status_code == 200
+    assert limiter.rejected == {("POST", "/things/{thing_id}"): 1}
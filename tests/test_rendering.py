@@ -0,0 +1,36 @@
+import pytest
+
+from rendering import negotiate_encoding
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("br;q=1.0, gzip;q=1.0", "br"),
+    ("gzip;q=1.0, br;q=0.1", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=0, br", "br"),
+    ("gzip;q=0, br;q=0", None),
+    ("*", "br"),
+    ("*;q=0.5, gzip", "gzip"),
+    ("gzip;q=0.5, identity", None),
+    ("", None),
+    ("deflate", None),
+])
+def test_negotiate_encoding_ranks_by_quality(header, expected):
+    assert negotiate_encoding(header, ("br", "gzip")) == expected
+
+
+@pytest.mark.parametrize("path", ["/api/hero-slides/", "/openapi.json"])
+def test_gzip_q0_is_never_gzipped(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "gzip;q=0"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "-gzip" not in response.headers.get("etag", "")
+
+
+def test_payload_follows_client_preference(client):
+    response = client.get("/api/hero-slides/", headers={"Accept-Encoding": "gzip;q=1.0, br;q=0.1"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].endswith('-gzip"')
+    assert len(response.json()) == 5
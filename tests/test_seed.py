@@ -0,0 +1,40 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+import database
+import seed
+
+
+def test_reseeding_does_not_restore_deleted_samples():
+    async def run():
+        database.connect_to_database(AsyncMongoMockClient())
+        try:
+            await seed.seed_database()
+            await database.hero_slides_collection.delete_one({"id": "2"})
+            await database.featured_stories_collection.delete_many({})
+
+            await seed.seed_database()
+            slides = await database.hero_slides_collection.count_documents({})
+            stories = await database.featured_stories_collection.count_documents({})
+            return slides, stories
+        finally:
+            await database.close_db_connection()
+
+    assert asyncio.run(run()) == (len(seed.HERO_SLIDES) - 1, 0)
+
+
+def test_populated_collections_are_not_seeded():
+    async def run():
+        database.connect_to_database(AsyncMongoMockClient())
+        try:
+            await database.hero_slides_collection.insert_one({"id": "own", "title": "Existing slide"})
+            await seed.seed_database()
+            return (
+                await database.hero_slides_collection.count_documents({}),
+                await database.regional_highlights_collection.count_documents({}),
+            )
+        finally:
+            await database.close_db_connection()
+
+    assert asyncio.run(run()) == (1, len(seed.REGIONAL_HIGHLIGHTS))
@@ -0,0 +1,116 @@
+import asyncio
+
+import orjson
+
+import routes.newsletter as newsletter
+from signup_queue import SignupQueue
+
+
+class Writer:
+    """Records each batch; with hold set, every write waits until release()"""
+
+    def __init__(self, hold: bool = False):
+        self.batches = []
+        self.gate = asyncio.Event()
+        if not hold:
+            self.gate.set()
+
+    def release(self):
+        self.gate.set()
+
+    async def __call__(self, emails):
+        self.batches.append(list(emails))
+        await self.gate.wait()
+        return {"writeErrors": []}
+
+
+def failures(path):
+    return [orjson.loads(line) for line in path.read_bytes().splitlines()]
+
+
+def test_signups_are_written_in_batches():
+    async def run():
+        writer = Writer()
+        queue = SignupQueue(writer, batch_size=3, flush_interval=0.01)
+        queue.start()
+        for number in range(7):
+            assert queue.submit(f"reader{number}@example.com")
+        await queue.drain(timeout=5)
+        return writer, queue
+
+    writer, queue = asyncio.run(run())
+    assert [len(batch) for batch in writer.batches] == [3, 3, 1]
+    assert queue.written == 7
+    assert queue.failed == 0
+    assert not queue.running
+
+
+def test_full_queue_rejects_signups():
+    async def run():
+        writer = Writer(hold=True)
+        queue = SignupQueue(writer, maxsize=2, batch_size=1)
+        queue.start()
+        assert queue.submit("first@example.com")
+        # The consumer takes the first email and blocks writing it
+        await asyncio.sleep(0.01)
+        accepted = [queue.submit(f"reader{number}@example.com") for number in range(3)]
+        writer.release()
+        await queue.drain(timeout=5)
+        return accepted, queue
+
+    accepted, queue = asyncio.run(run())
+    assert accepted == [True, True, False]
+    assert queue.rejected == 1
+    assert queue.written == 3
+
+
+def test_subscribe_answers_503_when_the_queue_refuses(client, monkeypatch):
+    monkeypatch.setattr(newsletter, "NEWSLETTER_WRITE_BEHIND", True)
+    # Never started, as after a drain: nothing is accepted
+    monkeypatch.setattr(newsletter, "signup_queue", SignupQueue(Writer()))
+
+    response = client.post("/api/newsletter/subscribe", json={"email": "queued@example.com"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == newsletter.QUEUE_FULL_RETRY_AFTER
+
+
+def test_drain_timeout_dead_letters_unwritten_signups(tmp_path):
+    async def run():
+        writer = Writer(hold=True)
+        queue = SignupQueue(writer, batch_size=2, flush_interval=0.01, failures_path=tmp_path / "failures.ndjson")
+        queue.start()
+        for number in range(5):
+            queue.submit(f"reader{number}@example.com")
+        await asyncio.sleep(0.05)
+        # The first batch is stuck in the writer; the drain gives up on it
+        await queue.drain(timeout=0.05)
+        return queue
+
+    queue = asyncio.run(run())
+    records = failures(tmp_path / "failures.ndjson")
+    assert sorted(record["email"] for record in records) == [f"reader{number}@example.com" for number in range(5)]
+    assert {record["reason"] for record in records} == {"shutdown"}
+    assert queue.failed == 5
+    assert queue.dead_lettered == 5
+    assert queue.written == 0
+    assert queue.depth() == 0
+
+
+def test_failed_writes_are_dead_lettered(tmp_path):
+    async def run():
+        async def writer(emails):
+            # The second email breaks the unique index, say
+            return {"writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}]}
+
+        queue = SignupQueue(writer, batch_size=3, flush_interval=0.01, failures_path=tmp_path / "failures.ndjson")
+        queue.start()
+        for email in ("a@example.com", "b@example.com", "c@example.com"):
+            queue.submit(email)
+        await queue.drain(timeout=5)
+        return queue
+
+    queue = asyncio.run(run())
+    assert [(record["email"], record["reason"]) for record in failures(tmp_path / "failures.ndjson")] == [
+        ("b@example.com", "write error")
+    ]
+    assert (queue.written, queue.failed, queue.dead_lettered) == (2, 1, 1)